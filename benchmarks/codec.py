@@ -0,0 +1,65 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Compares the codecs in jibe.codec on realistic messages: the
+'children' message of a list of todo items, as built from the
+widgets' toJSON(), and a batch of property updates.
+
+    python benchmarks/codec.py [number of items]
+"""
+
+import sys
+from timeit import timeit
+from jibe import HBox, VBox, CheckBox, Label
+from jibe.codec import codecs
+from jibe.widget import IdentifierAllocator
+
+
+def children_message(n):
+    with IdentifierAllocator().activate():
+        todos = [HBox([CheckBox(), Label(f'Todo item number {i}')])
+                 for i in range(n)]
+        box = VBox(todos)
+    return {'event': 'children', 'id': box.identifier,
+            'children': [child.toJSON() for child in box.children]}
+
+
+def properties_batch(n):
+    identifier = IdentifierAllocator()
+    return {'batch': [
+        {'event': 'properties', 'id': identifier(),
+         'properties': {'value': i * 0.5}}
+        for i in range(n)
+    ]}
+
+
+def main(n=1000, repeat=20):
+    payloads = {
+        'children': children_message(n),
+        'properties': properties_batch(n)
+    }
+
+    print(f'{"codec":10}{"payload":12}{"bytes":>10}{"dumps ms":>12}{"loads ms":>12}')
+    for name, cls in codecs.items():
+        try:
+            codec = cls()
+        except ImportError:
+            print(f'{name:10}(not installed)')
+            continue
+
+        for pname, payload in payloads.items():
+            data = codec.dumps(payload)
+            t_dumps = timeit(lambda: codec.dumps(payload), number=repeat)
+            t_loads = timeit(lambda: codec.loads(data), number=repeat)
+            print(f'{name:10}{pname:12}{len(data):>10}'
+                  f'{1000 * t_dumps / repeat:>12.3f}{1000 * t_loads / repeat:>12.3f}')
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,66 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Time to build a tree of widgets: a VBox with todo items, each
+an HBox with a CheckBox and a Label (3 widgets per item).
+
+For reference, it also times the per-instance dir()/getattr()
+scan for event handlers that Widget.__init__ used to run.
+
+    python benchmarks/construction.py [number of items]
+"""
+
+import sys
+from time import perf_counter
+from jibe import HBox, VBox, CheckBox, Label
+
+
+def build(n):
+    return VBox([HBox([CheckBox(), Label(f'Item {i}')]) for i in range(n)])
+
+
+def legacy_scan(widget):
+    """The event handler lookup formerly done in Widget.__init__."""
+    handlers = {}
+    for method_name in dir(widget):
+        if isinstance(getattr(widget.__class__, method_name, None), property):
+            continue
+        method = getattr(widget, method_name)
+        if callable(method) and not method_name.startswith('__'):
+            try:
+                handlers[method.event_register[0]] = method
+            except AttributeError:
+                pass
+    return handlers
+
+
+def walk(widget):
+    yield widget
+    for child in widget.children:
+        yield from walk(child)
+
+
+def main(n=5000):
+    t0 = perf_counter()
+    tree = build(n)
+    t1 = perf_counter()
+    widgets = list(walk(tree))
+    print(f'Built {len(widgets)} widgets in {1000 * (t1 - t0):.1f} ms '
+          f'({1e6 * (t1 - t0) / len(widgets):.1f} us per widget).')
+
+    t0 = perf_counter()
+    for widget in widgets:
+        legacy_scan(widget)
+    t1 = perf_counter()
+    print(f'The per-instance dir() scan alone would add '
+          f'{1000 * (t1 - t0):.1f} ms.')
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
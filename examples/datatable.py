@@ -0,0 +1,36 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import numpy as np
+from jibe import MainApp
+from jibe import DataTable
+
+
+class ExampleApp(MainApp):
+
+    def __init__(self, connection):
+        super().__init__(connection)
+
+        n = 1000000
+        rng = np.random.default_rng(0)
+        cities = np.array(['Lima', 'Oslo', 'Quito', 'Tokyo', 'Lagos', 'Perth'])
+
+        self.table = DataTable({
+            'id': np.arange(n),
+            'city': cities[rng.integers(0, len(cities), n)],
+            'temperature': rng.normal(20, 8, n).round(1),
+            'visitors': rng.integers(0, 10000, n)
+        }, page_size=25)
+
+        self.children = [
+            self.table
+        ]
+
+
+if __name__ == "__main__":
+    ExampleApp.run(8881)
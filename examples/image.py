@@ -7,7 +7,6 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
 from jibe import MainApp, Image
-import base64
 
 
 class ExampleApp(MainApp):
@@ -16,7 +15,7 @@ class ExampleApp(MainApp):
         super().__init__(connection)
 
         with open('data/image.png', 'rb') as img:
-            data = base64.encodebytes(img.read()).decode('utf-8')
+            data = img.read()
 
         img = Image()
         img.data = data
@@ -8,26 +8,32 @@
 
 import tornado.ioloop
 from jibe import MainApp
-from jibe import Widget, Button, Input, HBox, VBox, CheckBox, Label, Image
-import matplotlib
-import matplotlib.pyplot as plt
-from io import BytesIO, StringIO
+from jibe import Button, HBox, Figure
 import numpy as np
-import base64
 
-matplotlib.use('AGG')
+
+def plot_sine(figure, frequency):
+    """
+    Draws the figure. It runs in a pool of threads (See Figure),
+    so it must not touch any widget.
+    """
+    ax = figure.add_subplot()
+    x = np.linspace(0, 10, num=100)
+    ax.plot(x, np.sin(frequency * x))
+    ax.grid()
 
 
 class MPLApp(MainApp):
     """
     Images and dynamic update. Specifically, we plot some curves
-    using the Matplotlib plotting library.
+    using the Matplotlib plotting library. The figures are rendered
+    outside of the IOLoop, so other sessions are not blocked.
     """
 
     def __init__(self, connection):
         super().__init__(connection)
 
-        self.chart = Image()
+        self.chart = Figure(plot_sine, 1, figsize=(6, 4), dpi=100)
         self.button1 = Button('Button 1')
         self.button2 = Button('Button 2')
         self.button3 = Button('Button 3')
@@ -45,44 +51,21 @@ class MPLApp(MainApp):
             self.buttonbox
         ]
 
-        self.figure, self.ax = plt.subplots(1, 1, figsize=(6, 4), dpi=100)
-
-        x = np.linspace(0, 10, num=100)
-        y = np.sin(x)
-        image = BytesIO()
-        self.ax.plot(x, y)
-        self.ax.grid()
-        self.figure.savefig(image, format='png')
-        w, h = self.figure.get_size_inches() * self.figure.dpi
-        self.chart.attr({'width': str(w), 'height': str(h)})
-        self.chart.data = base64.encodebytes(image.getvalue()).decode('utf8')
+        self.frequency = 1
 
     def on_btn1(self, source, message):
-        self.ax.clear()
-        x = np.linspace(0, 10, num=100)
-        y = np.sin(2*x)
-        image = BytesIO()
-        self.ax.plot(x, y)
-        self.ax.grid()
-        self.figure.savefig(image, format='png')
-        self.chart.data = base64.encodebytes(image.getvalue()).decode('utf8')
+        self.chart.update(2)
 
     def on_btn2(self, source, message):
-        self.ax.clear()
-        x = np.linspace(0, 10, num=100)
-        y = np.sin(x)
-        image = BytesIO()
-        self.ax.plot(x, y)
-        self.ax.grid()
-        self.figure.savefig(image, format='png')
-        self.chart.data = base64.encodebytes(image.getvalue()).decode('utf8')
+        self.chart.update(1)
 
     def on_btn3(self, source, message):
-        w, h = self.figure.get_size_inches() * self.figure.dpi
-        self.chart.attr({'width': str(w), 'height': str(h)})
+        # Clicking fast renders only the latest frequency.
+        self.frequency += 1
+        self.chart.update(self.frequency)
 
 
 if __name__ == "__main__":
     app = MPLApp.make_tornado_app()
     app.listen(8881)
-    tornado.ioloop.IOLoop.current().start()
\ No newline at end of file
+    tornado.ioloop.IOLoop.current().start()
@@ -64,10 +64,9 @@ class TodoListWidget(VBox):
     def on_clear_completed(self, source, message):
         print(f'{self.__class__.__name__}.on_clear_completed({repr(source)}')
 
-        for todo in self.todolist.children:
+        for todo in list(self.todolist.children):
             if todo.completed:
                 self.todolist.children.remove(todo)
-                # TODO: This is not yet implemented in the client.
 
 
 class ExampleApp(MainApp):
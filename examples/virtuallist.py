@@ -0,0 +1,39 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from jibe import MainApp
+from jibe import Label, VirtualList
+
+
+class ExampleApp(MainApp):
+
+    def __init__(self, connection):
+        super().__init__(connection)
+
+        self.items = [f'Row number {i}' for i in range(100000)]
+
+        self.list = VirtualList(
+            self.items,
+            row_factory=Label,
+            update_row=self.update_row,
+            row_height=24,
+            height=480,
+            style={'border': '1px solid gray', 'width': '300px'}
+        )
+
+        self.children = [
+            self.list
+        ]
+
+    @staticmethod
+    def update_row(row, item):
+        row.value = item
+
+
+if __name__ == "__main__":
+    ExampleApp.run(8881)
@@ -3,8 +3,9 @@ from .app import MainApp, WebSocketHandler, MainHandler, \
 from .widget import Widget, Button, Input, HBox, VBox, \
     CheckBox, Label, NotifyList2, Image, ProgressBar, \
     Dropdown, Redirect, SelectMultiple, event_handler, \
-    TextArea, Div, HTML
+    TextArea, Div, HTML, VirtualList, DataTable, Figure
 from .page import htmlt
+from .executor import run_in_executor
 
 __all__ = [
     'MainApp',
@@ -26,8 +27,12 @@ __all__ = [
     "TextArea",
     "Redirect",
     "HTML",
+    "VirtualList",
+    "DataTable",
+    "Figure",
     "htmlt",
     "event_handler",
+    "run_in_executor",
     "MultiAppHandler",
     "MultiApp",
     "InJupyterApp",
@@ -22,8 +22,17 @@ let APP2 = {
      */
     wsopen: $.Deferred(),
 
+    /**
+     * WebSocket subprotocols offered to the server, in order
+     * of preference. MessagePack is offered if msgpack.js
+     * is loaded.
+     */
+    protocols: (typeof msgpack === 'undefined') ?
+        ['jibe.json'] : ['jibe.msgpack', 'jibe.json'],
+
     connect: function(url="ws://localhost:8881/websocket") {
-        this.ws = new WebSocket(url);
+        this.ws = new WebSocket(url, this.protocols);
+        this.ws.binaryType = 'arraybuffer';
 
         // Runs when the WebSocket connects. Resolves the wsopen
         // promise/deferred.
@@ -42,28 +51,112 @@ let APP2 = {
     /**
      * Handler for WebSocket messages. These are routed to the
      * widget indicated by the messgae's id.
+     *
+     * The server may send several messages in a single frame
+     * as {batch: [message, ...]}. These are delivered in order.
+     * A message that fails is logged and skipped, so it does not
+     * take the rest of the batch with it.
      * @param {Event} event
      */
     onWsMessage(event) {
-        let message = JSON.parse(event.data);
+        if (event.data instanceof ArrayBuffer && event.data.byteLength > 0 &&
+                new Uint8Array(event.data, 0, 1)[0] === this.BLOB_FRAME) {
+            this.onBlobFrame(event.data);
+            return;
+        }
+
+        let message = this.decode(event.data);
 
         console.log("[APP] Message received: ", message);
 
-        this.topwidget.local_deliver(message);
+        let messages = message.batch === undefined ? [message] : message.batch;
+        for (let msg of messages) {
+            try {
+                this.dispatch(msg);
+            }
+            catch (error) {
+                console.error('[APP] Failed to handle message: ', msg, error);
+            }
+        }
+    },
+
+    /**
+     * Delivers a single message from the server.
+     * @param {Object} msg
+     */
+    dispatch(msg) {
+        if (msg.event === 'types') {
+            Object.assign(this.types, msg.types);
+            return;
+        }
+
+        let widget = this.widgets.get(msg.id);
+        if (widget !== undefined) {
+            widget.openMessage(msg);
+        }
+        else if (msg.path !== undefined) {
+            this.topwidget.local_deliver(msg);
+        }
+        else {
+            console.warn(`[APP] No widget "${msg.id}" for message: `, msg);
+        }
+    },
+
+    /**
+     * First byte of binary frames with raw bytes for a widget.
+     * Never used by MessagePack.
+     */
+    BLOB_FRAME: 0xc1,
+
+    /**
+     * Handles a binary frame with raw bytes for a widget:
+     * BLOB_FRAME, length of the id, id, length of the MIME type,
+     * MIME type, data. The data is passed to the widget as a Blob
+     * (See Widget2.onBlob()).
+     * @param {ArrayBuffer} data
+     */
+    onBlobFrame(data) {
+        let bytes = new Uint8Array(data);
+        let decoder = new TextDecoder();
+
+        let idEnd = 2 + bytes[1];
+        let id = decoder.decode(bytes.subarray(2, idEnd));
+        let mimeEnd = idEnd + 1 + bytes[idEnd];
+        let mime = decoder.decode(bytes.subarray(idEnd + 1, mimeEnd));
+
+        let widget = this.widgets.get(id);
+        if (widget === undefined) {
+            console.warn(`[APP] No widget "${id}" for ${bytes.length - mimeEnd} bytes.`);
+            return;
+        }
+        widget.onBlob(new Blob([bytes.subarray(mimeEnd)], {type: mime}));
+    },
+
+    /**
+     * Decodes a frame from the server. Text frames are JSON.
+     * Binary frames are MessagePack.
+     * @param {string|ArrayBuffer} data
+     * @returns {{}}
+     */
+    decode(data) {
+        if (typeof data === 'string') {
+            return JSON.parse(data);
+        }
+        return msgpack.decode(data);
     },
 
     /**
-     * Sends a message to the server.
+     * Sends a message to the server, encoded in the
+     * format negotiated with the server.
      * @param message
      */
     send: function(message) {
-        this.ws.send(JSON.stringify(
-            message,
-            //function(key, value) {  // Remove possible circular references.
-            //    if (key == 'parent') { return value.id; }
-            //    else { return value; }
-            //}
-        ));
+        if (this.ws.protocol === 'jibe.msgpack') {
+            this.ws.send(msgpack.encode(message));
+        }
+        else {
+            this.ws.send(JSON.stringify(message));
+        }
     },
 
     deliver: function(message) {
@@ -88,7 +181,21 @@ let APP2 = {
         });
     },
 
-    outbox: []
+    outbox: [],
+
+    /**
+     * All widgets by id, for routing messages from the server.
+     * Widgets add themselves when constructed and are removed
+     * with Widget2.unregister().
+     */
+    widgets: new Map(),
+
+    /**
+     * Widget definitions (template, handlers, render and
+     * customMethods) by type id. Sent by the server once
+     * per type, before the first widget of that type.
+     */
+    types: {}
 
 };
 
@@ -141,6 +248,7 @@ class Widget2 extends Backbone.View {
 
         this.id = id;  // cid is part of Backbone.View... use that?
         console.log(`[${this.id}] constructor()`);
+        APP2.widgets.set(id, this);
 
         this.model = new Backbone.Model(properties);
 
@@ -158,9 +266,21 @@ class Widget2 extends Backbone.View {
 
         this.template_src = template;
 
+        // DOM nodes produced by the template (See render()), and the
+        // HTML they came from.
+        this._templateNodes = [];
+        this._templateHTML = null;
+
+        // Text and attribute nodes bound to properties, for simple
+        // templates (See Widget2.analyzeTemplate() and patch()).
+        this._bindings = null;
+
+        // Whether all the children's DOM nodes are in this widget's.
+        this._childrenAttached = true;
+
         // The callback gets bind'ed with this.listenTo.
         if (renderOnChange) {
-            this.listenTo(this.model, 'change', this.render);
+            this.listenTo(this.model, 'change', this.onModelChange);
         }
 
         // TODO: This condition is better checked in the else statement inside?
@@ -187,6 +307,7 @@ class Widget2 extends Backbone.View {
             children: [this.onChildren.bind(this)],
             append: [this.onAppendChild.bind(this)],
             remove: [this.onRemoveChild.bind(this)],
+            children_ops: [this.onChildrenOps.bind(this)],
             css: [this.onCSS.bind(this)],
             attr: [this.onAttr.bind(this)],
             properties: [this.onProperties.bind(this)]  // Equivalent on server is "change"
@@ -211,26 +332,306 @@ class Widget2 extends Backbone.View {
         return this._parent;
     }
 
+    /**
+     * The compiled template. Compilations are shared by all
+     * widgets with the same template source.
+     * @returns {function}
+     */
     get template() {
-        // TODO: Cache compilation
-        return Handlebars.compile(
-            this.template_src
-        );
+        return Widget2.compileTemplate(this.template_src);
+    }
+
+    /**
+     * Compiles a Handlebars template or gets it from the cache.
+     * @param {string} src Template source.
+     * @returns {function}
+     */
+    static compileTemplate(src) {
+        let template = Widget2.templates.get(src);
+        if (template === undefined) {
+            template = Handlebars.compile(src);
+            Widget2.templates.set(src, template);
+        }
+        return template;
+    }
+
+    /**
+     * Analyses a template or gets the analysis from the cache.
+     *
+     * deps are the names of the properties the template reads, or
+     * null if they cannot be determined (partials, the whole context
+     * passed to a helper, etc.). Properties used inside blocks may
+     * be over-counted, which only costs extra renders.
+     *
+     * A template is simple if it has no blocks, helpers or triple
+     * stashes, only {{ name }} in text and attribute values. The DOM
+     * of simple templates is built once and then patched (See patch()).
+     *
+     * @param {string} src Template source.
+     * @returns {{deps: ?Array<string>, simple: boolean, mustaches: number}}
+     */
+    static analyzeTemplate(src) {
+        let analysis = Widget2.analyses.get(src);
+        if (analysis !== undefined) {
+            return analysis;
+        }
+
+        let deps = new Set();
+        let known = true;
+        let simple = true;
+        let mustaches = 0;
+
+        // contextChanged: Inside an #each or #with block, where paths
+        // refer to something other than the model.
+        function visitExpression(expr, contextChanged) {
+            if (expr.type === 'PathExpression') {
+                if (expr.data) {
+                    if (expr.parts[0] === 'root') {
+                        if (expr.parts.length > 1) {
+                            deps.add(expr.parts[1]);
+                        } else {
+                            known = false;
+                        }
+                    }
+                } else if (expr.parts.length > 0) {
+                    deps.add(expr.parts[0]);
+                } else if (!contextChanged || expr.depth > 0) {
+                    known = false;  // The whole model, i.e. {{ this }}.
+                }
+            } else if (expr.type === 'SubExpression') {
+                visitArguments(expr, contextChanged);
+            }
+        }
+
+        function visitArguments(node, contextChanged) {
+            for (let param of node.params) {
+                visitExpression(param, contextChanged);
+            }
+            if (node.hash) {
+                for (let pair of node.hash.pairs) {
+                    visitExpression(pair.value, contextChanged);
+                }
+            }
+        }
+
+        function visitProgram(program, contextChanged) {
+            for (let statement of program ? program.body : []) {
+                switch (statement.type) {
+                    case 'MustacheStatement':
+                        mustaches++;
+                        if (statement.params.length > 0 || statement.hash) {
+                            // A helper.
+                            simple = false;
+                            visitArguments(statement, contextChanged);
+                        } else {
+                            let path = statement.path;
+                            if (!statement.escaped || path.type !== 'PathExpression' ||
+                                path.data || path.depth > 0 || path.parts.length !== 1) {
+                                simple = false;
+                            }
+                            visitExpression(path, contextChanged);
+                        }
+                        break;
+                    case 'BlockStatement':
+                        simple = false;
+                        visitArguments(statement, contextChanged);
+                        let inner = contextChanged ||
+                            ['if', 'unless'].indexOf(statement.path.original) === -1;
+                        visitProgram(statement.program, inner);
+                        visitProgram(statement.inverse, inner);
+                        break;
+                    case 'ContentStatement':
+                    case 'CommentStatement':
+                        break;
+                    default:
+                        // Partials and decorators.
+                        known = false;
+                }
+            }
+        }
+
+        try {
+            visitProgram(Handlebars.parse(src), false);
+        } catch (e) {
+            console.warn(`Cannot analyse template: ${e}`);
+            known = false;
+        }
+
+        analysis = {
+            deps: known ? Array.from(deps) : null,
+            simple: known && simple && mustaches > 0,
+            mustaches: mustaches
+        };
+        Widget2.analyses.set(src, analysis);
+        return analysis;
+    }
+
+    /**
+     * Called when the model changes, if renderOnChange is set.
+     * Nothing is done if the template does not read any of the
+     * changed properties. Simple templates are patched (See patch()).
+     * Others are rendered (See render()).
+     *
+     * Custom render methods are always called, since what they
+     * depend on is unknown.
+     *
+     * @param {Backbone.Model} model
+     */
+    onModelChange(model) {
+        if (this.render !== Widget2.prototype.render) {
+            this.render();
+            return;
+        }
+
+        let analysis = Widget2.analyzeTemplate(this.template_src);
+        let changed = Object.keys(model.changedAttributes() || {});
+        if (analysis.deps !== null && !changed.some(name => analysis.deps.indexOf(name) !== -1)) {
+            return;
+        }
+
+        if (this._bindings !== null) {
+            this.patch(changed);
+        } else {
+            this.render();
+        }
     }
 
     /**
-     * Renders the widget itself, its children and appends their DOM
-     * nodes to this widget's DOM node.
+     * Creates the DOM nodes of a simple template (See
+     * Widget2.analyzeTemplate()) with the nodes that depend on
+     * properties bound to them (this._bindings).
+     *
+     * The template is rendered with a unique marker in place of
+     * each property. Text nodes and attribute values with markers
+     * are bound. If not all markers are found (e.g. one was used in
+     * a tag name), the template is not simple after all.
+     *
+     * @param analysis Analysis of the template.
+     * @returns {boolean} Whether the nodes were created.
+     */
+    bindTemplate(analysis) {
+        let markers = {};
+        analysis.deps.forEach((name, i) => markers[name] = `\uE000${i}\uE001`);
+        let nodes = $.parseHTML(this.template(markers), document, true) || [];
+
+        // Splits text with markers into text and indexes of deps.
+        let found = 0;
+        function parts(text) {
+            let result = text.split(/\uE000(\d+)\uE001/);
+            if (result.length === 1) {
+                return null;
+            }
+            found += (result.length - 1) / 2;
+            return result.map((part, i) => i % 2 === 1 ? Number(part) : part);
+        }
+
+        let bindings = [];
+        for (let root of nodes) {
+            let walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT);
+            for (let node = root; node !== null; node = walker.nextNode()) {
+                if (node.nodeType === Node.TEXT_NODE) {
+                    let p = parts(node.nodeValue);
+                    if (p !== null) {
+                        bindings.push({node: node, attr: null, parts: p});
+                    }
+                    continue;
+                }
+                if (node.nodeType !== Node.ELEMENT_NODE) {
+                    continue;
+                }
+                for (let attr of Array.from(node.attributes)) {
+                    let p = parts(attr.value);
+                    if (p !== null) {
+                        bindings.push({node: node, attr: attr.name, parts: p});
+                    }
+                }
+            }
+        }
+
+        if (found !== analysis.mustaches) {
+            analysis.simple = false;
+            return false;
+        }
+
+        $(this._templateNodes).remove();
+        this._templateNodes = nodes;
+        this._bindings = bindings;
+        this.$el.prepend(nodes);
+        return true;
+    }
+
+    /**
+     * Updates the bound text and attribute nodes of a simple
+     * template (See bindTemplate()).
+     *
+     * @param {?Array<string>} changed Names of the properties that
+     *        changed. Default is null, which updates all nodes.
+     */
+    patch(changed = null) {
+        let deps = Widget2.analyzeTemplate(this.template_src).deps;
+        let data = this.model.attributes;
+        for (let binding of this._bindings) {
+            if (changed !== null && !binding.parts.some(
+                    (part, i) => i % 2 === 1 && changed.indexOf(deps[part]) !== -1)) {
+                continue;
+            }
+
+            // Like Handlebars does, except HTML escaping, which the DOM does.
+            let text = binding.parts.map((part, i) => {
+                if (i % 2 === 0) {
+                    return part;
+                }
+                let value = data[deps[part]];
+                return value === null || value === undefined ? '' : String(value);
+            }).join('');
+
+            if (binding.attr === null) {
+                if (binding.node.nodeValue !== text) {
+                    binding.node.nodeValue = text;
+                }
+            } else if (binding.node.getAttribute(binding.attr) !== text) {
+                binding.node.setAttribute(binding.attr, text);
+            }
+        }
+    }
+
+    /**
+     * Renders the widget's own template. Only the DOM nodes produced
+     * by the template are replaced, and only if the resulting HTML
+     * changed. They go in front of the children's DOM nodes, which
+     * are left untouched, so the cost does not depend on the number
+     * of descendents. Simple templates are only patched (See patch()).
+     *
+     * Children that are not attached yet (See onChildren()) are
+     * rendered and appended.
      * @returns {Widget2}
      */
     render() {
         console.log(`[${this.id}] render()`);
-        // TODO: Perhaps we want to render this widget after the children.
-        this.$el.empty();
-        this.$el.html(this.template(this.model.toJSON()));
-        for (let child of this.children) {
-            this.$el.append(child.$el);
-            child.render();
+
+        let analysis = Widget2.analyzeTemplate(this.template_src);
+        if (this._bindings === null && analysis.simple) {
+            this.bindTemplate(analysis);
+        }
+
+        if (this._bindings !== null) {
+            this.patch();
+        } else {
+            let html = this.template(this.model.toJSON());
+            if (html !== this._templateHTML) {
+                $(this._templateNodes).remove();
+                this._templateNodes = $.parseHTML(html, document, true) || [];
+                this.$el.prepend(this._templateNodes);
+                this._templateHTML = html;
+            }
+        }
+
+        if (!this._childrenAttached) {
+            for (let child of this.children) {
+                this.$el.append(child.$el);
+                child.render();
+            }
+            this._childrenAttached = true;
         }
         return this;   // Useful convention
     }
@@ -282,6 +683,35 @@ class Widget2 extends Backbone.View {
     }
 
     /**
+     * Tears down this widget and its descendents: removes them
+     * from the index of widgets in APP2, removes their DOM
+     * elements (and jQuery handlers) and stops all Backbone
+     * listeners. References are released so they can be
+     * garbage collected.
+     */
+    destroy() {
+        for (let child of this.children) {
+            child.destroy();
+        }
+        this.children = [];
+
+        // A new widget with the same id may have replaced this one.
+        if (APP2.widgets.get(this.id) === this) {
+            APP2.widgets.delete(this.id);
+        }
+
+        this.revokeBlobURL();
+        this.remove();  // Backbone: $el.remove() and stopListening().
+        this.model.off();
+        this.msgHandlers = {};
+        this._parent = null;
+    }
+
+    /**
+     * Messages from the server are normally routed directly by
+     * id (See APP2.onWsMessage). This is used only if the message
+     * has a 'path' and the widget is not in the index.
+     *
      * This method is called when a message is received from the server
      * and a parent widget has routed it to us since this widget is listed
      * next in the msg.path. It is either adressed to this widget or
@@ -370,10 +800,14 @@ class Widget2 extends Backbone.View {
     onChildren(message) {
         console.log("[" + this.id + "] .onChildren()");
 
+        for (let child of this.children) {
+            child.destroy();
+        }
         this.children = [];
         for (let child of message.children) {
             this.children.push(this.fromJSON(child));
         }
+        this._childrenAttached = false;
 
         // Handles all rendering, and appending of children.
         this.render();
@@ -390,6 +824,10 @@ class Widget2 extends Backbone.View {
 
         widgetJSON.attributes.id = widgetJSON.id;  // TODO: Hacky!
 
+        // Static part, shared by all widgets of this type.
+        let type = APP2.types[widgetJSON.type];
+        let compiled = Widget2.compileType(type);
+
         let newWidget = new Widget2(
             widgetJSON.id,
             widgetJSON.properties,
@@ -397,9 +835,9 @@ class Widget2 extends Backbone.View {
             {   // TODO: Manually listing these is very error prone.
                 attributes: widgetJSON.attributes,
                 style: widgetJSON.style,
-                tagName: widgetJSON.tagName,
-                className: widgetJSON.className,
-                template: widgetJSON.template,
+                tagName: type.tagName,
+                className: type.className,
+                template: type.template,
                 renderOnChange: widgetJSON.renderOnChange,
                 notifyServerOnChange: widgetJSON.notifyServerOnChange
             }
@@ -409,29 +847,67 @@ class Widget2 extends Backbone.View {
         // Note: It may be convenient to use the view's delegateEvents instead of
         // directly using jQuery's mechanism.
         // Handlers receiver the 'event' parameter containing an event object.
-        for (let [handlerName, handlerBody] of Object.entries(widgetJSON.handlers)) {
-            newWidget.$el.on(handlerName, Function('event', handlerBody).bind(newWidget));
+        for (let [handlerName, handler] of compiled.handlers) {
+            newWidget.$el.on(handlerName, handler.bind(newWidget));
         }
 
-        // Custom render() method.
-        if (widgetJSON.render !== null) {
-            // this.listenTo(this.model, 'change', this.render);
-            newWidget.stopListening(newWidget.model, 'change', newWidget.render);
-            newWidget.render = Function(widgetJSON.render);
-            newWidget.listenTo(newWidget.model, 'change', newWidget.render);
+        // Custom render() method. It is called on every change
+        // of the model (See onModelChange()).
+        if (compiled.render !== null) {
+            newWidget.render = compiled.render;
         }
 
         // Custom methods.
         // They are attached as message handlers.
         // They are passed a single parameter called 'msg' with the entire message
         // from the server.
-        for (let [methodName, methodBody] of Object.entries(widgetJSON.customMethods)) {
-            newWidget.msgHandlers[methodName] = Function('msg', methodBody).bind(newWidget);
+        for (let [methodName, method] of compiled.customMethods) {
+            newWidget.msgHandlers[methodName] = method.bind(newWidget);
         }
 
         return newWidget
     }
 
+    /**
+     * Compiles the Javascript code in a widget type (handlers,
+     * render and customMethods). This is done once per type and
+     * the result is saved in type.compiled. The functions are
+     * not bound. Each widget binds them to itself.
+     *
+     * @param type Widget type definition (See APP2.types).
+     * @returns {{handlers: Array, render: ?function, customMethods: Array}}
+     */
+    static compileType(type) {
+        if (type.compiled === undefined) {
+            type.compiled = {
+                handlers: Object.entries(type.handlers).map(
+                    ([name, body]) => [name, Widget2.compileFunction('event', body)]),
+                render: type.render === null ? null : Widget2.compileFunction('', type.render),
+                customMethods: Object.entries(type.customMethods).map(
+                    ([name, body]) => [name, Widget2.compileFunction('msg', body)])
+            };
+        }
+        return type.compiled;
+    }
+
+    /**
+     * Creates a function from its source or gets it from the cache.
+     * Different types often share code, like the 'change' handlers.
+     *
+     * @param {string} arg Name of the argument. Empty for none.
+     * @param {string} body Body of the function.
+     * @returns {function}
+     */
+    static compileFunction(arg, body) {
+        let key = arg + '\n' + body;
+        let fn = Widget2.functions.get(key);
+        if (fn === undefined) {
+            fn = arg === '' ? Function(body) : Function(arg, body);
+            Widget2.functions.set(key, fn);
+        }
+        return fn;
+    }
+
     /**
      * Appends one child sent from the server. This is triggered when
      * a message is received from the server and msg.event == 'append'.
@@ -446,20 +922,99 @@ class Widget2 extends Backbone.View {
 
         let child = this.fromJSON(message.child);
 
-        // TODO: Figure out how to append and render only what is new in children.
         this.children.push(child);
         child.render();
         this.$el.append(child.$el);
     }
 
     /**
-     * Removes this widget.
+     * Removes a child and destroys it (See destroy()). This is
+     * triggered when a message is received from the server and
+     * msg.event == 'remove'.
      * @param message
      */
     onRemoveChild(message) {
         console.log("[" + this.id + "] .onRemoveChild()");
-        // $("#_" + message.childid).remove();
-        // TODO
+
+        let index = this.children.findIndex(child => child.id === message.childid);
+        if (index === -1) {
+            console.warn(`[${this.id}] No child "${message.childid}" to remove.`);
+            return;
+        }
+
+        let [child] = this.children.splice(index, 1);
+        child.destroy();
+    }
+
+    /**
+     * Applies changes to the children in place. This is triggered when
+     * a message is received from the server and msg.event == 'children_ops'.
+     * Children that remain keep their models and DOM nodes, which are
+     * only moved if needed.
+     *
+     * Each op is one of:
+     *   {op: 'remove', childid}
+     *   {op: 'insert', child, before}
+     *   {op: 'move', childid, before}
+     * where before is the id of the child to go in front of, or null
+     * for the end.
+     *
+     * @param {{ops: Array}} message
+     */
+    onChildrenOps(message) {
+        console.log("[" + this.id + "] .onChildrenOps()");
+
+        for (let op of message.ops) {
+            if (op.op === 'remove') {
+                this.onRemoveChild(op);
+                continue;
+            }
+
+            let child;
+            if (op.op === 'insert') {
+                child = this.fromJSON(op.child);
+                child.render();
+            } else {
+                let index = this.children.findIndex(c => c.id === op.childid);
+                if (index === -1) {
+                    console.warn(`[${this.id}] No child "${op.childid}" to move.`);
+                    continue;
+                }
+                [child] = this.children.splice(index, 1);
+            }
+
+            let index = op.before === null ? -1 : this.children.findIndex(c => c.id === op.before);
+            if (index === -1) {
+                this.children.push(child);
+                this.$el.append(child.$el);
+            } else {
+                child.$el.insertBefore(this.children[index].$el);
+                this.children.splice(index, 0, child);
+            }
+        }
+    }
+
+    /**
+     * Receives raw bytes from the server (See APP2.onBlobFrame()).
+     * They are shown through an object URL in the src attribute of
+     * this widget's element. The previous URL is revoked.
+     * @param {Blob} blob
+     */
+    onBlob(blob) {
+        let url = URL.createObjectURL(blob);
+        this.el.src = url;
+        this.revokeBlobURL();
+        this._blobURL = url;
+    }
+
+    /**
+     * Releases the object URL created by onBlob(), if any.
+     */
+    revokeBlobURL() {
+        if (this._blobURL !== undefined) {
+            URL.revokeObjectURL(this._blobURL);
+            this._blobURL = undefined;
+        }
     }
 
     onCSS(message) {
@@ -493,4 +1048,23 @@ class Widget2 extends Backbone.View {
     //     this.msgHandlers[msgtype].push(handler.bind(this));
     // }
 
-}
\ No newline at end of file
+}
+
+
+/**
+ * Compiled Handlebars templates by source.
+ * See Widget2.compileTemplate().
+ */
+Widget2.templates = new Map();
+
+/**
+ * Analyses of templates by source.
+ * See Widget2.analyzeTemplate().
+ */
+Widget2.analyses = new Map();
+
+/**
+ * Functions compiled from source sent by the server.
+ * See Widget2.compileFunction().
+ */
+Widget2.functions = new Map();
@@ -9,16 +9,47 @@
 import tornado.web
 import tornado.websocket
 import tornado.ioloop
-import json
-from .widget import Widget, VBox
+from .widget import Widget, VBox, IdentifierAllocator, widget_types
+from .codec import Codec, get_codec
+from .blobstore import BlobHandler
+from . import log
 from .page import htmlt
-from typing import List, Dict, Optional, Awaitable
+from typing import List, Dict, Optional, Awaitable, Union
 from pathlib import Path
 from random import choice
+from collections import OrderedDict
+from itertools import count, islice
+import asyncio
 
 
 letter = 'abcdefghijklmnopqrstuvwxyz1234567890'
 
+logger = log.get_logger(__name__)
+
+BLOB_FRAME = 0xc1
+"""First byte of binary frames carrying raw bytes for a widget
+(See blob_frame()). It is never used by MessagePack, so these frames
+cannot be confused with messages."""
+
+
+def blob_frame(identifier: str, mime: str, data: bytes) -> bytes:
+    """
+    Binary WebSocket frame with raw bytes for a widget:
+    BLOB_FRAME, length of the identifier, identifier, length of the
+    MIME type, MIME type, data. Lengths are 1 byte.
+
+    :param identifier: Identifier of the widget.
+    :param mime: MIME type of the data.
+    :param data: Bytes.
+    :return: The frame.
+    """
+    identifier = identifier.encode('utf-8')
+    mime = mime.encode('ascii')
+    if len(identifier) > 255 or len(mime) > 255:
+        raise ValueError('Widget identifier or MIME type too long for a blob frame.')
+    return b''.join([bytes([BLOB_FRAME, len(identifier)]), identifier,
+                     bytes([len(mime)]), mime, data])
+
 
 # noinspection PyAbstractClass
 class MainHandler(tornado.web.RequestHandler):
@@ -70,7 +101,7 @@ class MultiAppHandler(MainHandler):
     """
 
     def get(self, appname):
-        print(f'{__class__.__name__}.get("{appname}")')
+        logger.debug('%s.get("%s")', __class__.__name__, appname)
 
         sessionid = self.get_cookie("sessionid")
         if not sessionid:
@@ -121,6 +152,89 @@ class MainApp(VBox):
     the future.
     """
 
+    mergeable_events = {
+        'properties': 'properties',
+        'css': 'css',
+        'attr': 'attr',
+        'page': 'page',
+        'blob': 'blob'
+    }
+    """
+    Events whose pending messages to the same widget are merged
+    into one before being sent. The values are the names of the
+    dictionaries in the message that get merged, with the latest
+    value winning for each key.
+    """
+
+    structural_events = {'types', 'children', 'append', 'remove', 'children_ops'}
+    """
+    Events that change the structure of the page in the browser.
+    They are never merged or dropped (See self.overflow_policy).
+    """
+
+    max_in_flight_bytes = 2 ** 20
+    """
+    Maximum number of bytes written to the connection but not yet
+    sent out to the network. Above it, the connection is congested
+    and messages wait in self.pending, where mergeable ones keep
+    being merged (See self.flush()).
+    """
+
+    max_pending = 1000
+    """Number of messages in self.pending above which the
+    self.overflow_policy applies."""
+
+    overflow_policy = 'merge'
+    """
+    What to do when more than self.max_pending messages are pending:
+
+    * 'block': Keep all of them, and make the producers wait:
+      self.deliver() (and Widget.message()) return a future that
+      resolves once the queue is back within the limit. Producers
+      must await it for the queue to stay bounded.
+    * 'merge': Keep only the latest message of each widget and event,
+      for all events, except self.structural_events.
+    * 'drop-oldest': Drop the oldest messages, except
+      self.structural_events.
+    * 'disconnect': Close the connection.
+
+    Except with 'disconnect', self.structural_events are never limited,
+    so the queue can grow beyond self.max_pending with them.
+    """
+
+    max_offloaded = 4
+    """Maximum number of functions of one app running in executors
+    at the same time (See Widget.offload()), so that one session
+    cannot take the whole pool."""
+
+    codec: Codec = get_codec()
+    """
+    Encodes and decodes the messages exchanged with the browser.
+    By default, the fastest JSON codec installed (orjson, ujson or
+    the standard library). See jibe.codec.
+    """
+
+    binary_codec: Optional[Codec] = None
+    """
+    Binary codec to use instead of self.codec when the browser
+    supports it. This is negotiated with the WebSocket subprotocol.
+    For example, set to jibe.codec.MessagePackCodec() to use
+    MessagePack. Default is None (JSON only).
+    """
+
+    websocket_compression: Optional[Dict] = None
+    """
+    Set to a dictionary to enable permessage-deflate compression
+    of the WebSocket messages. For example:
+
+        {'compression_level': 6, 'mem_level': 8, 'min_size': 512}
+
+    compression_level (0-9) and mem_level (1-9) are passed to zlib.
+    Messages shorter than min_size bytes are sent uncompressed.
+    Any of the keys can be omitted. Default is None (No compression).
+    The bytes saved are in WebSocketHandler.compression_stats.
+    """
+
     def __init__(self, connection):
         """
         The MainApp class represents the top-level widget of a page.
@@ -129,58 +243,415 @@ class MainApp(VBox):
         :param connection: Instance of
             WebSocketHandler(tornado.websocket.WebSocketHandler)
         """
-        print(f'{self.__class__.__name__}.__init__()')
-
         super().__init__(identifier='topwidget')
 
         self.connection = connection
 
-        print(f'{self.__class__.__name__}.identifier == {self.identifier}')
+        self._app = self
+
+        self.descendent_index = {}
+        """All widgets attached to this app by identifier.
+        See self.register()."""
+
+        self.id_allocator = getattr(connection, 'id_allocator', None) \
+            or IdentifierAllocator()
+        """Identifiers for the widgets of this app. Activate it to
+        create widgets outside of message handling."""
+
+        # The codec negotiated by the connection, if any.
+        self.codec = getattr(connection, 'codec', None) or self.codec
+
+        self.io_loop = tornado.ioloop.IOLoop.current()
+        """The loop serving this connection. Outbound messages are
+        flushed on it."""
+
+        self._offload_semaphore = None
+
+        self.pending = OrderedDict()
+        """Outbound messages waiting for the next flush. Keyed by
+        (widget id, event) for events in self.mergeable_events, and
+        by a sequence number for all others."""
+
+        self._sequence = count()
+        self._flush_scheduled = False
+
+        self._unmerged = 0
+        """Messages in self.pending keyed by sequence number that the
+        'merge' policy could merge. See self._merge_pending()."""
+
+        self.sent_types = set()
+        """Widget types already sent to the browser. See Widget.type_id()."""
+
+        self.in_flight_bytes = 0
+        """Bytes written to the connection and not yet sent out.
+        See self.max_in_flight_bytes."""
+
+        self.queue_stats = {
+            'max_queue_depth': 0,
+            'congested_flushes': 0,
+            'overflows': 0,
+            'dropped': 0
+        }
+        """Counters about the outbound queue. See self.queue_depth."""
+
+        self._drain_waiters = []
+
+    def register(self, widget: Widget):
+        """
+        Registers a widget and its descendents in self.descendent_index,
+        and sets their app to this one. Called when the widget is
+        attached to a widget of this app. Subtrees that are already
+        registered are skipped, so each widget is visited once.
+
+        :param widget: Widget being attached.
+        :return: None
+        """
+        index = self.descendent_index
+        stack = [widget]
+        while stack:
+            w = stack.pop()
+            if w._app is self:
+                continue
+            w._app = self
+            index[w.identifier] = w
+            stack.extend(w.children)
+
+    def unregister(self, widget: Widget):
+        """
+        Removes a widget and its descendents from self.descendent_index
+        and clears their app. Pending updates to them are dropped.
+        They are marked as not ready in the browser, since their browser
+        side is destroyed. If they are attached again, they are
+        recreated in the browser.
+
+        :param widget: Widget being detached.
+        :return: None
+        """
+        index = self.descendent_index
+        stack = [widget]
+        while stack:
+            w = stack.pop()
+            if w._app is not self:
+                continue
+            w._app = None
+            w.browser_side_ready = False
+            if index.get(w.identifier) is w:
+                del index[w.identifier]
+            for event in self.mergeable_events:
+                self.pending.pop((w.identifier, event), None)
+            stack.extend(w.children)
 
     def on_message(self, message: Dict):
         """
         Called by the websocket handler's on_message. Overrides
         the parent widget's on_message. Delivers the message to
         the parent class (super) or to descendent (child).
+        Messages for widgets that are no longer registered are
+        dropped.
 
         :param message: The message from the client.
         :return: None
         """
-        print(f'{self.__class__.__name__}.on_message():')
-        print(message)
+        if log.log_bodies and logger.isEnabledFor(log.DEBUG):
+            logger.debug('%s.on_message(): %s', self.__class__.__name__, message)
 
         if message['id'] == self.identifier:
             super().on_message(message)
-        else:
-            self.descendent_index[message['id']].on_message(message)
+            return
+
+        widget = self.descendent_index.get(message['id'])
+        if widget is None:
+            # E.g. a late event from a widget that was just removed.
+            logger.debug('Dropped %s message for unknown widget %s.',
+                         message.get('event'), message['id'])
+            return
+        widget.on_message(message)
+
+    @property
+    def offload_semaphore(self) -> asyncio.Semaphore:
+        """
+        Limits the functions of this app running in executors to
+        self.max_offloaded. See Widget.offload().
+        """
+        if self._offload_semaphore is None:
+            self._offload_semaphore = asyncio.Semaphore(self.max_offloaded)
+        return self._offload_semaphore
 
     def deliver(self, message: Dict):
         """
-        Delivers a message to the browser. If self.wshandler.connection
-        is None (websocket has not been opened), the messages are queued in
-        self.outbox. All queued messages are delivered once the websocket opens
-        (self.wsopen is called).
+        Delivers a message to the browser. If the browser side is not
+        ready, the messages are queued in self.outbox. All queued messages
+        are delivered once the browser side reports it is ready.
+
+        Messages are not written right away. They are collected in
+        self.pending and sent together by self.flush(), which runs once
+        in the next iteration of the IOLoop. This way, a handler that
+        updates many widgets produces a single WebSocket frame.
 
         :param message: Message to be delivered.
-        :return: None
+        :return: None, or a future to await before producing more
+            messages (See self.overflow_policy).
         """
-        print(f'{self.__class__.__name__}.deliver()')
-
-        # Queued messages will re-attempt delivery so the
-        # identifier will already be attached to the path.
-        if len(message['path']) == 0 or message['path'][0] != self.identifier:
-            message['path'].insert(0, self.identifier)
-
         # if self.wshandler.connection is None:
         if not self.browser_side_ready:
             # Save the messages. They will be delivered when we open
             # the connection.
             self.outbox.append(message)
-            print(f'   Appended to outbox: {message["event"]}')
+            logger.debug('Appended to outbox: %s', message['event'])
+        else:
+            self.send_types(message)
+            wait = self.enqueue(message)
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.io_loop.add_callback(self.flush)
+            return wait
+
+    def send_types(self, message: Dict):
+        """
+        Queues the definitions of the widget types in the message
+        that have not been sent to the browser yet. They go in a
+        single {'event': 'types', 'types': {...}} message ahead of
+        the given message.
+
+        :param message: Message about to be queued.
+        :return: None
+        """
+        if message['event'] == 'children':
+            widgets = message['children']
+        elif message['event'] == 'append':
+            widgets = [message['child']]
+        elif message['event'] == 'children_ops':
+            widgets = [op['child'] for op in message['ops'] if op['op'] == 'insert']
         else:
-            # self.wshandler.connection.write_message(json.dumps(msg))
-            self.connection.write_message(json.dumps(message))
-            print(f'   Sent out: {"message"}')
+            return
+
+        types = {}
+        for widget in widgets:
+            type_id = widget['type']
+            if type_id not in self.sent_types:
+                definition = widget_types.get(type_id)
+                if definition is None:
+                    # Evicted since the message was made (See max_widget_types).
+                    definition = self.descendent_index[widget['id']].definition()
+                types[type_id] = definition
+                self.sent_types.add(type_id)
+
+        if types:
+            self.enqueue({'event': 'types', 'types': types})
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of messages waiting to be sent.
+        """
+        return len(self.pending)
+
+    def enqueue(self, message: Dict):
+        """
+        Adds a message to self.pending. If a message for the same widget
+        and of the same mergeable event is already pending, the new one
+        is merged into it and the result is moved to the end of the queue.
+        Only the net change goes over the wire.
+
+        If there are too many pending messages, self.overflow_policy
+        applies.
+
+        :param message: Message to be sent.
+        :return: None, or a future to await with the 'block' policy.
+        """
+        event = message['event']
+        field = self.mergeable_events.get(event)
+        if field is None:
+            if len(self.pending) >= self.max_pending and self.overflow_policy == 'merge' \
+                    and event not in self.structural_events:
+                key = (message.get('id'), event)
+                self.pending.pop(key, None)
+                self.pending[key] = message
+            else:
+                self.pending[next(self._sequence)] = message
+                if event not in self.structural_events:
+                    self._unmerged += 1
+            return self._check_overflow()
+
+        key = (message['id'], message['event'])
+        queued = self.pending.pop(key, None)
+        if queued is None:
+            # Copy, since we may update it later and the
+            # dictionary may belong to the caller.
+            message[field] = dict(message[field])
+        else:
+            queued[field].update(message[field])
+            message = queued
+        self.pending[key] = message
+        return self._check_overflow()
+
+    def _check_overflow(self) -> Optional[asyncio.Future]:
+        """
+        Applies self.overflow_policy if there are more than
+        self.max_pending messages pending.
+
+        :return: A future that resolves when the queue is drained,
+            with the 'block' policy. Otherwise None.
+        """
+        depth = len(self.pending)
+        stats = self.queue_stats
+        stats['max_queue_depth'] = max(stats['max_queue_depth'], depth)
+        if depth <= self.max_pending:
+            return
+
+        stats['overflows'] += 1
+        policy = self.overflow_policy
+        if policy == 'drop-oldest':
+            protected = self.structural_events
+            oldest = (key for key, message in self.pending.items()
+                      if message['event'] not in protected)
+            for key in list(islice(oldest, depth - self.max_pending)):
+                del self.pending[key]
+                stats['dropped'] += 1
+        elif policy == 'merge':
+            # Messages over the limit are merged as they come (See
+            # self.enqueue()). Merge the ones from before, once.
+            if self._unmerged:
+                self._merge_pending()
+        elif policy == 'disconnect':
+            logger.warning('%d messages pending. Closing the connection.', depth)
+            self.pending.clear()
+            self._unmerged = 0
+            self.connection.close()
+        if stats['overflows'] == 1 and policy in ('block', 'merge'):
+            logger.warning('More than %d messages pending (%s policy).', self.max_pending, policy)
+        if policy == 'block':
+            return self._wait_drained()
+
+    def _merge_pending(self):
+        """
+        Keeps only the latest pending message of each widget and event,
+        except for self.structural_events.
+
+        :return: None
+        """
+        pending = OrderedDict()
+        for key, message in self.pending.items():
+            if isinstance(key, int) and message['event'] not in self.structural_events:
+                key = (message.get('id'), message['event'])
+                pending.pop(key, None)
+            pending[key] = message
+        self.pending = pending
+        self._unmerged = 0
+
+    async def drain(self):
+        """
+        Waits until there are at most self.max_pending messages pending
+        and the connection is not congested. Producers of many messages
+        can await it so they do not outpace the browser.
+
+        :return: None
+        """
+        while self._congested():
+            await self._wait_drained()
+
+    def _congested(self) -> bool:
+        return len(self.pending) > self.max_pending or \
+            self.in_flight_bytes >= self.max_in_flight_bytes
+
+    def _wait_drained(self) -> asyncio.Future:
+        """
+        :return: A future that resolves the next time the queue is
+            checked and found drained (See self.drain()).
+        """
+        future = asyncio.get_event_loop().create_future()
+        self._drain_waiters.append(future)
+        return future
+
+    def _notify_drained(self):
+        if not self._drain_waiters or self._congested():
+            return
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_result(None)
+
+    def flush(self):
+        """
+        Sends all pending messages to the browser. A single message is
+        sent as is. Several messages are sent together in one frame as
+        {'batch': [message, ...]}.
+
+        'blob' messages ({'event': 'blob', 'blob': {'data': bytes,
+        'mime': str}}) are not encoded. Their bytes go as they are in
+        a binary frame each (See blob_frame()), after the rest.
+
+        Nothing is sent while the connection is congested (See
+        self.max_in_flight_bytes). The flush runs again once enough
+        of what was written is sent out.
+
+        :return: None
+        """
+        self._flush_scheduled = False
+        if len(self.pending) == 0:
+            return
+
+        if self.in_flight_bytes >= self.max_in_flight_bytes:
+            self.queue_stats['congested_flushes'] += 1
+            return
+
+        messages = list(self.pending.values())
+        self.pending.clear()
+        self._unmerged = 0
+
+        blobs = [message for message in messages if message['event'] == 'blob']
+        if blobs:
+            messages = [message for message in messages if message['event'] != 'blob']
+
+        if messages:
+            if len(messages) == 1:
+                data = self.codec.dumps(messages[0])
+            else:
+                data = self.codec.dumps({'batch': messages})
+            self._write(data, self.codec.binary)
+            logger.debug('Sent out %d message(s) in %d bytes.', len(messages), len(data))
+
+        for message in blobs:
+            blob = message['blob']
+            self._write(blob_frame(message['id'], blob['mime'], blob['data']), True)
+            logger.debug('Sent out %d bytes for %s.', len(blob['data']), message['id'])
+
+        self._notify_drained()
+
+    def _write(self, data: Union[str, bytes], binary: bool):
+        """
+        Writes a frame to the connection and counts it in
+        self.in_flight_bytes until it is sent out.
+
+        :param data: Frame.
+        :param binary: Whether it is a binary frame.
+        :return: None
+        """
+        try:
+            future = self.connection.write_message(data, binary=binary)
+        except tornado.websocket.WebSocketClosedError:
+            logger.debug('Connection closed. Dropping %d bytes.', len(data))
+            return
+        if future is None:
+            return
+
+        size = len(data)
+        self.in_flight_bytes += size
+        future.add_done_callback(lambda f: self._on_written(f, size))
+
+    def _on_written(self, future, size: int):
+        """
+        Called when a frame was sent out (or failed). Resumes
+        flushing if it was held back by congestion.
+        """
+        if not future.cancelled():
+            future.exception()  # Retrieved, so it is not reported as unhandled.
+        self.in_flight_bytes -= size
+        if self.pending and not self._flush_scheduled and \
+                self.in_flight_bytes < self.max_in_flight_bytes:
+            self._flush_scheduled = True
+            self.io_loop.add_callback(self.flush)
+        self._notify_drained()
 
     @classmethod
     def make_tornado_app(cls) -> tornado.web.Application:
@@ -199,6 +670,7 @@ class MainApp(VBox):
         handlers = [
             (r"/", cls.main_handler_class),
             (r"/websocket", WSH),
+            (r"/_blob/([0-9a-f]+)", BlobHandler),
             (r"/(.*\.js)", tornado.web.StaticFileHandler, {"path": f"{jibe_assets_path}/"}),
             (r"/(.*\.css)", tornado.web.StaticFileHandler, {"path": f"{jibe_assets_path}/"})
         ]
@@ -219,7 +691,7 @@ class MainApp(VBox):
             if path['from'][0] != '/':
                 raise ValueError(f'Assets path must be absolute: {path["from"]}')
 
-            print(f'ASSETS SOURCE: {path["from"]}')
+            logger.debug('Assets source: %s', path['from'])
             handlers.append(
                 (rf"/{path['to']}/(.*)", tornado.web.StaticFileHandler,
                  {"path": f'{path["from"]}'})
@@ -240,6 +712,24 @@ class MainApp(VBox):
         tornado.ioloop.IOLoop.current().start()
 
 
+class _CountingCompressor:
+    """
+    Wraps Tornado's per-message compressor to keep count of
+    the bytes before and after compression.
+    """
+
+    def __init__(self, compressor, stats: Dict):
+        self.compressor = compressor
+        self.stats = stats
+
+    def compress(self, data: bytes) -> bytes:
+        compressed = self.compressor.compress(data)
+        self.stats['compressed_messages'] += 1
+        self.stats['raw_bytes'] += len(data)
+        self.stats['compressed_bytes'] += len(compressed)
+        return compressed
+
+
 class WebSocketHandler(tornado.websocket.WebSocketHandler):
     """
     Serves application widgets and handles communications during the
@@ -257,6 +747,89 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
         super(WebSocketHandler, self).__init__(*args, **kwargs)
         self.app = None
 
+        self.codec = self.mainApp.codec
+        """Codec for this connection. See self.select_subprotocol()."""
+
+        self.id_allocator = IdentifierAllocator()
+        """Identifiers for the widgets of this connection's app."""
+
+        self.compression_stats = {
+            'compressed_messages': 0,
+            'raw_bytes': 0,
+            'compressed_bytes': 0,
+            'skipped_messages': 0,
+            'skipped_bytes': 0
+        }
+        """Compression counters for this connection. See
+        MainApp.websocket_compression."""
+
+    def get_compression_options(self) -> Optional[Dict]:
+        """
+        Enables compression if the app sets websocket_compression.
+
+        :return: Compression options for Tornado, or None.
+        """
+        options = self.mainApp.websocket_compression
+        if options is None:
+            return None
+        return {key: options[key] for key in ('compression_level', 'mem_level')
+                if key in options}
+
+    @property
+    def bytes_saved(self) -> int:
+        """Number of bytes that compression has saved so far."""
+        stats = self.compression_stats
+        return stats['raw_bytes'] - stats['compressed_bytes']
+
+    def write_message(self, message, binary=False):
+        """
+        Sends a message to the browser. Messages shorter than the
+        app's websocket_compression['min_size'] are not compressed.
+
+        :param message: str or bytes.
+        :param binary: Whether to send a binary frame.
+        :return: Future that resolves when the message is written.
+        """
+        compressor = getattr(self.ws_connection, '_compressor', None)
+        min_size = (self.mainApp.websocket_compression or {}).get('min_size', 0)
+        if compressor is None or min_size == 0:
+            return super().write_message(message, binary)
+
+        if isinstance(message, str):
+            message = message.encode('utf8')
+        if len(message) >= min_size:
+            return super().write_message(message, binary)
+
+        # Each message is compressed on its own (RSV1 bit), so it is
+        # fine to skip some. The browser only keeps the compression
+        # context of compressed messages.
+        self.compression_stats['skipped_messages'] += 1
+        self.compression_stats['skipped_bytes'] += len(message)
+        self.ws_connection._compressor = None
+        try:
+            return super().write_message(message, binary)
+        finally:
+            self.ws_connection._compressor = compressor
+
+    def select_subprotocol(self, subprotocols: List[str]) -> Optional[str]:
+        """
+        Chooses the wire format from the subprotocols offered by the
+        browser. The app's binary codec is preferred if the browser
+        offers it. Otherwise the app's (JSON) codec is used.
+
+        :param subprotocols: Subprotocols offered by the browser.
+        :return: The selected subprotocol or None.
+        """
+        binary_codec = self.mainApp.binary_codec
+        if binary_codec is not None and binary_codec.subprotocol in subprotocols:
+            self.codec = binary_codec
+            return binary_codec.subprotocol
+
+        self.codec = self.mainApp.codec
+        if self.codec.subprotocol in subprotocols:
+            return self.codec.subprotocol
+        return None
+
     def open(self):
         """
         Invoked when a new WebSocket is opened.
@@ -265,8 +838,16 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
 
         :return: None
         """
-        print(f'################################# {self.__class__.__name__}.open()')
-        self.app = self.mainApp(self)
+        logger.info('%s.open()', self.__class__.__name__)
+
+        compressor = getattr(self.ws_connection, '_compressor', None)
+        if compressor is not None:
+            self.ws_connection._compressor = _CountingCompressor(
+                compressor, self.compression_stats
+            )
+
+        with self.id_allocator.activate():
+            self.app = self.mainApp(self)
 
     def on_message(self, message):
         """
@@ -274,12 +855,15 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
         So far, messages are passed directly to the application. They could
         potentially be intercepted here for "pluggable" processing of messages.
 
-        :param message: A valid JSON string.
+        :param message: A message encoded with the connection's codec
+            (A JSON string by default).
         :return: None
         """
-        msg = json.loads(message)
-        print(f'{self.__class__.__name__} GOT MSG: {msg}')
-        self.app.on_message(msg)
+        msg = self.codec.loads(message)
+        if log.log_bodies and logger.isEnabledFor(log.DEBUG):
+            logger.debug('%s got message: %s', self.__class__.__name__, msg)
+        with self.id_allocator.activate():
+            self.app.on_message(msg)
 
     def on_close(self):
         """
@@ -288,7 +872,13 @@ class WebSocketHandler(tornado.websocket.WebSocketHandler):
 
         :return: None
         """
-        print(f'{self.__class__.__name__}.on_close()')
+        logger.info('%s.on_close()', self.__class__.__name__)
+        if self.compression_stats['compressed_messages'] > 0:
+            logger.info('Compression saved %d bytes in %d messages.',
+                        self.bytes_saved,
+                        self.compression_stats['compressed_messages'])
+        if self.app is not None:
+            logger.info('Outbound queue: %s', self.app.queue_stats)
         WebSocketHandler.connection = None
 
 
@@ -311,9 +901,10 @@ class MultiApp(tornado.web.Application):
 
         # TODO: Support specifying alternative files.
         jibe_assets_path = Path(__file__).parent.absolute()
-        print(f'Assets path: {jibe_assets_path}')
+        logger.debug('Assets path: %s', jibe_assets_path)
 
         handlers = [
+            (r"/_blob/([0-9a-f]+)", BlobHandler),
             (r"/(.*\.js)", tornado.web.StaticFileHandler, {"path": jibe_assets_path}),
             (r"/(.*\.css)", tornado.web.StaticFileHandler, {"path": jibe_assets_path})
         ]
@@ -349,7 +940,7 @@ class MultiApp(tornado.web.Application):
                 if path['from'][0] != '/':
                     raise ValueError(f'Assets path must be absolute: {path["from"]}')
 
-                print(f'ASSETS SOURCE: {path["from"]}')
+                logger.debug('Assets source: %s', path['from'])
                 handlers.append(
                     (rf"/{name}/{path['to']}/(.*)", tornado.web.StaticFileHandler,
                      {"path": path["from"]})
@@ -367,15 +958,14 @@ class MultiApp(tornado.web.Application):
             for path in ap:
                 if path['from'][0] != '/':
                     raise ValueError(f'Assets path must be absolute: {path["from"]}')
-                print(f'ASSETS SOURCE: {path["from"]}')
+                logger.debug('Assets source: %s', path['from'])
                 handlers.append(
                     (str(Path(path['to'] + "/")) + r"(.*)",
                      tornado.web.StaticFileHandler,
                      {"path": path['from']})
                 )
 
-        from pprint import pprint
-        pprint(handlers)
+        logger.debug('Handlers: %s', handlers)
         super().__init__(handlers, debug=True)
 
     def run(self, port=8881):
@@ -401,7 +991,7 @@ class InJupyterMultiApp(MultiApp):
         from tornado.ioloop import IOLoop
         import threading
         if not cls._io_loops:
-            print('No loop. Creating one.')
+            logger.debug('No loop. Creating one.')
             loop = IOLoop()
             thread = threading.Thread(target=loop.start)
             thread.daemon = True
@@ -432,7 +1022,7 @@ class InJupyterApp(MainApp):
         from tornado.ioloop import IOLoop
         import threading
         if not cls._io_loops:
-            print('No loop. Creating one.')
+            logger.debug('No loop. Creating one.')
             loop = IOLoop()
             thread = threading.Thread(target=loop.start)
             thread.daemon = True
@@ -0,0 +1,195 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Content-addressed storage of binary data (images, etc.) served
+over HTTP.
+
+Data is stored under a hash of its content and served at
+/_blob/<hash> by BlobHandler, which MainApp.make_tornado_app() and
+MultiApp register. Since the content at a URL never changes, the
+browser can cache it forever. Identical data is stored and sent
+only once, no matter how many widgets or sessions use it.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+import tornado.web
+from . import log
+
+logger = log.get_logger(__name__)
+
+
+class BlobStore:
+    """
+    Stores bytes by the hash of their content. When the total size
+    exceeds max_bytes, the least recently used data is evicted,
+    except for pinned data (See self.pin()), which is still in use.
+
+    It is safe to use from several threads.
+    """
+
+    url_prefix = '/_blob/'
+    """Path at which BlobHandler serves the data."""
+
+    def __init__(self, max_bytes: int = 128 * 2 ** 20):
+        """
+        Creates a BlobStore.
+
+        :param max_bytes: Maximum total size of the data in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        """Total size of the data in bytes."""
+
+        self._blobs = OrderedDict()
+        """(data, mime) by key, least recently used first."""
+
+        self._pins = {}
+        """Number of pins by key. See self.pin()."""
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: bytes, mime: str) -> str:
+        """
+        Hash of the data and its MIME type.
+
+        :param data: Bytes.
+        :param mime: MIME type.
+        :return: Hexadecimal digest.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(mime.encode('ascii'))
+        h.update(b'\0')
+        h.update(data)
+        return h.hexdigest()
+
+    def put(self, data: bytes, mime: str = 'application/octet-stream',
+            pin: bool = False) -> str:
+        """
+        Stores data. Data that is already stored becomes the most
+        recently used.
+
+        :param data: Bytes.
+        :param mime: MIME type of the data.
+        :param pin: Whether to pin the data (See self.pin()).
+        :return: Key of the data (See self.url()).
+        """
+        data = bytes(data)
+        key = self.key(data, mime)
+        with self._lock:
+            if pin:
+                self._pins[key] = self._pins.get(key, 0) + 1
+            if key in self._blobs:
+                self._blobs.move_to_end(key)
+                return key
+
+            self._blobs[key] = (data, mime)
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self._evict(key)
+        return key
+
+    def _evict(self, keep: str):
+        for key in list(self._blobs):
+            if self.size <= self.max_bytes:
+                break
+            if key == keep or key in self._pins:
+                continue
+            old, _ = self._blobs.pop(key)
+            self.size -= len(old)
+            logger.debug('Evicted blob %s (%d bytes).', key, len(old))
+
+    def pin(self, key: str):
+        """
+        Keeps stored data from being evicted until unpinned as many
+        times as it was pinned. Widgets pin the data they show, so
+        it can be requested as long as they live. Pinned data can
+        exceed max_bytes.
+
+        :param key: Key of the data.
+        :return: None
+        """
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key: str):
+        """
+        Undoes self.pin(). The data can be evicted again once it is
+        no longer pinned.
+
+        :param key: Key of the data.
+        :return: None
+        """
+        with self._lock:
+            pins = self._pins.get(key, 0) - 1
+            if pins > 0:
+                self._pins[key] = pins
+            else:
+                self._pins.pop(key, None)
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Retrieves data, which becomes the most recently used.
+
+        :param key: Key of the data.
+        :return: (data, mime), or None if not stored.
+        """
+        with self._lock:
+            blob = self._blobs.get(key)
+            if blob is not None:
+                self._blobs.move_to_end(key)
+            return blob
+
+    def url(self, key: str) -> str:
+        """
+        URL at which the data is served (See BlobHandler).
+
+        :param key: Key of the data.
+        :return: URL path.
+        """
+        return self.url_prefix + key
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._blobs
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+default_store = BlobStore()
+"""The store of the process, used by the widgets and BlobHandler."""
+
+
+# noinspection PyAbstractClass
+class BlobHandler(tornado.web.RequestHandler):
+    """
+    Serves data in a BlobStore at BlobStore.url_prefix + key. The
+    responses can be cached forever, since the content at a URL
+    never changes.
+    """
+
+    def initialize(self, store: Optional[BlobStore] = None):
+        self.store = default_store if store is None else store
+
+    def get(self, key: str):
+        blob = self.store.get(key)
+        if blob is None:
+            raise tornado.web.HTTPError(404)
+
+        data, mime = blob
+        self.set_header('Content-Type', mime)
+        self.set_header('Cache-Control', 'public, max-age=31536000, immutable')
+        self.set_header('ETag', f'"{key}"')
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        self.write(data)
@@ -0,0 +1,227 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+import json
+import math
+import base64
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def to_builtin(obj: Any) -> Any:
+    """
+    Converts objects that the encoders do not know about into
+    built-in types. Used as the 'default' hook of the encoders.
+
+    NumPy arrays and scalars (and anything else with a tolist()
+    method) become lists or Python numbers. Sets and tuples
+    become lists. Bytes become base64 strings (Binary codecs
+    encode bytes natively and never call this).
+
+    :param obj: Object that could not be encoded.
+    :return: An encodable representation of obj.
+    """
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode('ascii')
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
+def finite(obj: Any) -> Any:
+    """
+    Copy of obj that all the codecs encode the same way, as strict
+    JSON does: NaN and infinities become None (null), and dictionary
+    keys that are not strings become strings. Also converts what
+    to_builtin() converts, except for bytes.
+
+    Used only when an encoder rejects obj, since copying is slow.
+
+    :param obj: Object to encode.
+    :return: A copy of obj, or obj itself if there is nothing to change.
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key if isinstance(key, str) else _key(key): finite(value)
+                for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return [finite(item) for item in obj]
+    if hasattr(obj, 'tolist'):
+        return finite(obj.tolist())
+    return obj
+
+
+def _key(key: Any) -> str:
+    if key is True or key is False or key is None:
+        return json.dumps(key)
+    if hasattr(key, 'tolist'):
+        key = key.tolist()
+    return str(key)
+
+
+class Codec:
+    """
+    Encodes and decodes the messages exchanged with the browser.
+
+    LoudDict and NotifyList2 are subclasses of dict and list
+    and are encoded as such.
+
+    The JSON codecs encode the same values: NaN and infinities become
+    null, and keys that are not strings become strings (See finite()),
+    since the browser could not decode them otherwise.
+    """
+
+    name = None
+    """Name of the codec."""
+
+    binary = False
+    """Whether the encoded messages go in binary WebSocket frames."""
+
+    subprotocol = 'jibe.json'
+    """WebSocket subprotocol that identifies this wire format."""
+
+    def dumps(self, obj: Any) -> Union[str, bytes]:
+        raise NotImplementedError
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+
+class JSONCodec(Codec):
+    """
+    JSON using the standard library. Always available.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj):
+        try:
+            return json.dumps(obj, default=to_builtin, separators=(',', ':'), allow_nan=False)
+        except ValueError:
+            # NaN or infinity, which JSON.parse() rejects.
+            return json.dumps(finite(obj), default=to_builtin, separators=(',', ':'))
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """
+    JSON using orjson. Encodes to bytes (UTF-8), which can be
+    written in a text frame as is. It encodes NaN and infinities
+    as null by itself.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('orjson is not installed.')
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=to_builtin,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(Codec):
+    """
+    JSON using ujson.
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError('ujson is not installed.')
+
+    def dumps(self, obj):
+        try:
+            return ujson.dumps(obj, default=to_builtin, ensure_ascii=False)
+        except (OverflowError, ValueError):
+            # NaN or infinity.
+            return ujson.dumps(finite(obj), default=to_builtin, ensure_ascii=False)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class MessagePackCodec(Codec):
+    """
+    Binary MessagePack using msgpack. Bytes travel as MessagePack
+    binary (Uint8Array in the browser) and numbers are not converted
+    to text. The browser side is in msgpack.js.
+
+    NaN, infinities and non-string keys are encoded natively. The
+    browser decodes them as numbers and string keys.
+    """
+
+    name = 'msgpack'
+    binary = True
+    subprotocol = 'jibe.msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError('msgpack is not installed.')
+
+    def dumps(self, obj):
+        return msgpack.packb(obj, default=to_builtin, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+codecs: Dict[str, type] = {
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+    'json': JSONCodec,
+    'msgpack': MessagePackCodec
+}
+"""Known codecs by name, from most to least preferred."""
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Creates a codec.
+
+    :param name: Name of the codec (See codecs). Default is None,
+        which selects the fastest JSON codec that is installed.
+    :return: Codec instance.
+    """
+    if name is not None:
+        return codecs[name]()
+
+    for cls in codecs.values():
+        if cls.binary:
+            continue
+        try:
+            return cls()
+        except ImportError:
+            continue
@@ -0,0 +1,175 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Running CPU-heavy work outside of the IOLoop, so that it does not
+freeze every session of the process.
+
+    total = await self.offload(compute, data)             # In a thread.
+    total = await self.offload(compute, data, pool='process')
+    self.label.value = total                              # On the loop.
+
+Or, for a whole handler that computes new values of the widget's
+properties, which are assigned on the loop:
+
+    @event_handler('click')
+    @run_in_executor()
+    def on_click(self, msg):
+        return {'value': compute(self.data)}
+
+Only the computation runs in the pool. It must not change widgets,
+which are not thread-safe. Pools are created when first used.
+Replace them with configure(). In the process pool, the function
+and its arguments must be picklable. Handlers decorated with
+@run_in_executor(pool='process') get None instead of the widget,
+which cannot be sent to another process:
+
+    @event_handler('click')
+    @run_in_executor(pool='process')
+    def on_click(self, msg):
+        return {'value': compute(msg['n'])}   # self is None.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Union
+from . import log
+
+logger = log.get_logger(__name__)
+
+factories = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor
+}
+"""Functions that create the pools by name."""
+
+pools: Dict[str, Executor] = {}
+"""The pools by name. See get_executor()."""
+
+
+def configure(name: str, executor: Executor):
+    """
+    Sets the executor used for a pool. The previous one, if any,
+    is not shut down.
+
+    :param name: Name of the pool, like 'thread' or 'process'.
+    :param executor: Executor for the pool.
+    :return: None
+    """
+    pools[name] = executor
+
+
+def get_executor(pool: Union[str, Executor] = 'thread') -> Executor:
+    """
+    The executor of a pool, created with factories[pool] if needed.
+
+    :param pool: Name of the pool, or an executor, which is returned as is.
+    :return: The executor.
+    """
+    if isinstance(pool, Executor):
+        return pool
+    executor = pools.get(pool)
+    if executor is None:
+        try:
+            factory = factories[pool]
+        except KeyError:
+            raise ValueError(f'Unknown pool: {pool}')
+        executor = pools[pool] = factory()
+        logger.debug('Created the %s pool.', pool)
+    return executor
+
+
+async def _run(fn: Callable, args: tuple, kwargs: dict, pool: Union[str, Executor],
+               semaphore: Optional[asyncio.Semaphore]):
+    loop = asyncio.get_event_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    if semaphore is None:
+        return await loop.run_in_executor(get_executor(pool), call)
+    async with semaphore:
+        return await loop.run_in_executor(get_executor(pool), call)
+
+
+def offload(fn: Callable, *args, pool: Union[str, Executor] = 'thread',
+            semaphore: Optional[asyncio.Semaphore] = None, **kwargs) -> asyncio.Future:
+    """
+    Runs fn(*args, **kwargs) in a pool. Must be called on the loop.
+
+    :param fn: Function to run.
+    :param pool: Name of the pool, or an executor. See get_executor().
+    :param semaphore: Limits how many functions run at the same time,
+        counting the ones waiting for the pool. Default is None (no limit).
+    :return: Future with the result of fn, resolved on the loop.
+    """
+    return asyncio.ensure_future(_run(fn, args, kwargs, pool, semaphore))
+
+
+class _Method:
+    """
+    A method decorated with run_in_executor(), referenced by its class
+    and name, so it can be sent to another process. The function
+    itself cannot be pickled, since its name in the class refers to
+    the decorator's wrapper. It is called with None for self.
+    """
+
+    def __init__(self, cls: type, name: str):
+        self.cls = cls
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return getattr(self.cls, self.name).__wrapped__(None, *args, **kwargs)
+
+
+def _method(owner, wrapper: Callable) -> _Method:
+    for cls in type(owner).__mro__:
+        if cls.__dict__.get(wrapper.__name__) is wrapper:
+            return _Method(cls, wrapper.__name__)
+    raise TypeError(f'{wrapper.__qualname__} cannot run in a process pool. '
+                    f'Decorate a method of a module-level class.')
+
+
+async def _assign(owner, future: asyncio.Future):
+    result = await future
+    if isinstance(result, dict):
+        for name, value in result.items():
+            setattr(owner, name, value)
+    return result
+
+
+def run_in_executor(pool: Union[str, Executor] = 'thread') -> Callable:
+    """
+    A decorator for functions and widget methods (including event
+    handlers). Calling the decorated function runs it in a pool and
+    returns a future with its result (See offload()). It must be
+    called on the loop.
+
+    The decorated function must not change any widget. Methods of
+    widgets go through Widget.offload(), so they count towards the
+    limit of their app, and may return a dictionary of new values of
+    the widget's properties, which are assigned on the loop before
+    the future resolves. In a process pool, methods get None instead
+    of the widget, and the rest of the arguments must be picklable.
+
+    :param pool: Name of the pool, or an executor. See get_executor().
+    :return: Decorator.
+    """
+
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            owner = args[0] if args else None
+            if hasattr(owner, 'offload'):
+                if isinstance(get_executor(pool), ProcessPoolExecutor):
+                    future = owner.offload(_method(owner, wrapper), *args[1:], pool=pool, **kwargs)
+                else:
+                    future = owner.offload(f, *args, pool=pool, **kwargs)
+                return asyncio.ensure_future(_assign(owner, future))
+            return offload(f, *args, pool=pool, **kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,83 @@
+# Jibe
+# A Full-Stack Pure-Python Web Framework.
+# Copyright (c) 2020 Juan Pablo Caram
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Logging for Jibe.
+
+Every module logs to a child of the 'jibe' logger ('jibe.app',
+'jibe.widget', etc.). Nothing is output until the application
+configures logging, either with the standard logging module or
+with configure():
+
+    from jibe import log
+    log.configure('development')   # Everything, including messages.
+    log.configure('production')    # Warnings and errors only.
+
+Messages are formatted lazily and the costly ones are guarded,
+so disabled levels cost close to nothing.
+"""
+
+import logging
+from typing import Optional
+
+DEBUG = logging.DEBUG
+
+logger = logging.getLogger('jibe')
+logger.addHandler(logging.NullHandler())
+
+log_bodies = True
+"""Whether the contents of the messages to and from the browser
+may be logged (at DEBUG level). False in the production profile,
+in which message bodies are never formatted."""
+
+profiles = {
+    'development': {'level': logging.DEBUG, 'bodies': True},
+    'production': {'level': logging.WARNING, 'bodies': False}
+}
+"""Logging profiles for configure()."""
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger for a Jibe module.
+
+    :param name: Name of the module (__name__).
+    :return: A logger under the 'jibe' hierarchy.
+    """
+    if name != 'jibe' and not name.startswith('jibe.'):
+        name = 'jibe.' + name
+    return logging.getLogger(name)
+
+
+def configure(profile: str = 'development',
+              handler: Optional[logging.Handler] = None) -> logging.Logger:
+    """
+    Configures the 'jibe' logger with one of the profiles.
+
+    :param profile: 'development' or 'production'. See profiles.
+    :param handler: Handler to add to the 'jibe' logger. Default is
+        None, in which case a StreamHandler is added unless the logger
+        already has a handler other than the NullHandler.
+    :return: The 'jibe' logger.
+    """
+    global log_bodies
+
+    settings = profiles[profile]
+    logger.setLevel(settings['level'])
+    log_bodies = settings['bodies']
+
+    if handler is None and all(isinstance(h, logging.NullHandler)
+                               for h in logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s: %(message)s'
+        ))
+    if handler is not None:
+        logger.addHandler(handler)
+
+    return logger
@@ -0,0 +1,223 @@
+/* Jibe
+ * A Full-Stack Pure-Python Web Framework.
+ * Copyright (c) 2020 Juan Pablo Caram
+ *
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+
+/**
+ * Minimal MessagePack encoder and decoder for the binary
+ * wire protocol ("jibe.msgpack" WebSocket subprotocol).
+ *
+ * Supports nil, booleans, numbers, strings, binary (as
+ * Uint8Array), arrays and maps. Extension types are not
+ * used by Jibe and are not supported.
+ */
+let msgpack = {
+
+    textEncoder: new TextEncoder(),
+
+    textDecoder: new TextDecoder(),
+
+    /**
+     * Encodes a value into MessagePack.
+     * @param value
+     * @returns {Uint8Array}
+     */
+    encode(value) {
+        let buffer = new Uint8Array(256);
+        let view = new DataView(buffer.buffer);
+        let pos = 0;
+        let textEncoder = this.textEncoder;
+
+        function reserve(n) {
+            if (pos + n <= buffer.length) {
+                return;
+            }
+            let size = buffer.length * 2;
+            while (size < pos + n) {
+                size *= 2;
+            }
+            let bigger = new Uint8Array(size);
+            bigger.set(buffer);
+            buffer = bigger;
+            view = new DataView(buffer.buffer);
+        }
+
+        function u8(b) { reserve(1); view.setUint8(pos, b); pos += 1; }
+        function u16(n) { reserve(2); view.setUint16(pos, n); pos += 2; }
+        function u32(n) { reserve(4); view.setUint32(pos, n); pos += 4; }
+
+        function bytes(b) {
+            reserve(b.length);
+            buffer.set(b, pos);
+            pos += b.length;
+        }
+
+        function header(n, fix, fixmax, c16, c32) {
+            if (fix !== null && n <= fixmax) { u8(fix | n); }
+            else if (n < 0x10000) { u8(c16); u16(n); }
+            else { u8(c32); u32(n); }
+        }
+
+        function integer(n) {
+            if (n >= 0) {
+                if (n < 0x80) { u8(n); }
+                else if (n < 0x100) { u8(0xcc); u8(n); }
+                else if (n < 0x10000) { u8(0xcd); u16(n); }
+                else if (n < 0x100000000) { u8(0xce); u32(n); }
+                else { u8(0xcf); reserve(8); view.setBigUint64(pos, BigInt(n)); pos += 8; }
+            }
+            else {
+                if (n >= -0x20) { u8(0x100 + n); }
+                else if (n >= -0x80) { u8(0xd0); reserve(1); view.setInt8(pos, n); pos += 1; }
+                else if (n >= -0x8000) { u8(0xd1); reserve(2); view.setInt16(pos, n); pos += 2; }
+                else if (n >= -0x80000000) { u8(0xd2); reserve(4); view.setInt32(pos, n); pos += 4; }
+                else { u8(0xd3); reserve(8); view.setBigInt64(pos, BigInt(n)); pos += 8; }
+            }
+        }
+
+        function write(v) {
+            if (v === null || v === undefined) {
+                u8(0xc0);
+            }
+            else if (v === false) {
+                u8(0xc2);
+            }
+            else if (v === true) {
+                u8(0xc3);
+            }
+            else if (typeof v === 'number') {
+                if (Number.isSafeInteger(v)) {
+                    integer(v);
+                }
+                else {
+                    u8(0xcb); reserve(8); view.setFloat64(pos, v); pos += 8;
+                }
+            }
+            else if (typeof v === 'string') {
+                let b = textEncoder.encode(v);
+                if (b.length < 0x20) { u8(0xa0 | b.length); }
+                else if (b.length < 0x100) { u8(0xd9); u8(b.length); }
+                else { header(b.length, null, 0, 0xda, 0xdb); }
+                bytes(b);
+            }
+            else if (v instanceof Uint8Array || v instanceof ArrayBuffer) {
+                let b = v instanceof ArrayBuffer ? new Uint8Array(v) : v;
+                if (b.length < 0x100) { u8(0xc4); u8(b.length); }
+                else { header(b.length, null, 0, 0xc5, 0xc6); }
+                bytes(b);
+            }
+            else if (Array.isArray(v)) {
+                header(v.length, 0x90, 0x0f, 0xdc, 0xdd);
+                for (let item of v) {
+                    write(item);
+                }
+            }
+            else if (typeof v === 'object') {
+                // Like JSON.stringify, skip undefined and function values.
+                let keys = Object.keys(v).filter(
+                    k => v[k] !== undefined && typeof v[k] !== 'function');
+                header(keys.length, 0x80, 0x0f, 0xde, 0xdf);
+                for (let k of keys) {
+                    write(k);
+                    write(v[k]);
+                }
+            }
+            else {
+                throw TypeError(`Cannot encode ${typeof v} in MessagePack.`);
+            }
+        }
+
+        write(value);
+        return buffer.slice(0, pos);
+    },
+
+    /**
+     * Decodes a MessagePack value.
+     * @param {ArrayBuffer|Uint8Array} data
+     * @returns {*}
+     */
+    decode(data) {
+        let bytes = data instanceof Uint8Array ? data : new Uint8Array(data);
+        let view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        let pos = 0;
+        let textDecoder = this.textDecoder;
+
+        function str(n) {
+            let s = textDecoder.decode(bytes.subarray(pos, pos + n));
+            pos += n;
+            return s;
+        }
+
+        function bin(n) {
+            let b = bytes.slice(pos, pos + n);
+            pos += n;
+            return b;
+        }
+
+        function arr(n) {
+            let a = new Array(n);
+            for (let i = 0; i < n; i++) {
+                a[i] = read();
+            }
+            return a;
+        }
+
+        function map(n) {
+            let o = {};
+            for (let i = 0; i < n; i++) {
+                let k = read();
+                o[k] = read();
+            }
+            return o;
+        }
+
+        function u8() { let n = view.getUint8(pos); pos += 1; return n; }
+        function u16() { let n = view.getUint16(pos); pos += 2; return n; }
+        function u32() { let n = view.getUint32(pos); pos += 4; return n; }
+
+        function read() {
+            let b = u8();
+
+            if (b <= 0x7f) { return b; }
+            if (b <= 0x8f) { return map(b & 0x0f); }
+            if (b <= 0x9f) { return arr(b & 0x0f); }
+            if (b <= 0xbf) { return str(b & 0x1f); }
+            if (b >= 0xe0) { return b - 0x100; }
+
+            let n;
+            switch (b) {
+                case 0xc0: return null;
+                case 0xc2: return false;
+                case 0xc3: return true;
+                case 0xc4: return bin(u8());
+                case 0xc5: return bin(u16());
+                case 0xc6: return bin(u32());
+                case 0xca: n = view.getFloat32(pos); pos += 4; return n;
+                case 0xcb: n = view.getFloat64(pos); pos += 8; return n;
+                case 0xcc: return u8();
+                case 0xcd: return u16();
+                case 0xce: return u32();
+                case 0xcf: n = Number(view.getBigUint64(pos)); pos += 8; return n;
+                case 0xd0: n = view.getInt8(pos); pos += 1; return n;
+                case 0xd1: n = view.getInt16(pos); pos += 2; return n;
+                case 0xd2: n = view.getInt32(pos); pos += 4; return n;
+                case 0xd3: n = Number(view.getBigInt64(pos)); pos += 8; return n;
+                case 0xd9: return str(u8());
+                case 0xda: return str(u16());
+                case 0xdb: return str(u32());
+                case 0xdc: return arr(u16());
+                case 0xdd: return arr(u32());
+                case 0xde: return map(u16());
+                case 0xdf: return map(u32());
+                default:
+                    throw TypeError(`Unsupported MessagePack type: 0x${b.toString(16)}`);
+            }
+        }
+
+        return read();
+    }
+};
@@ -6,13 +6,32 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
-from random import choice
 from jinja2 import Template
-from typing import Callable, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from itertools import count
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import weakref
+import asyncio
+import inspect
 import json
+import base64
+import mimetypes
+from io import BytesIO
+from concurrent.futures import Executor
+import tornado.ioloop
+from . import log
+from .executor import offload, get_executor
+from .blobstore import BlobStore, default_store
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-letter = 'abcdefghijklmnopqrstuvwxyz1234567890'
+
+logger = log.get_logger(__name__)
 
 
 def callback_method_x(method: Callable, cbname: str) -> Callable:
@@ -79,28 +98,103 @@ def event_handler(*args):
 
     Mark the method as an event handler. Simply sets the attribute
     event_register to the given arguments tuple. This attribute is then
-    checked by the constructor of the class (eg. Widget).
+    checked once per class (See Widget._event_handler_table()).
 
     Example:
 
     Set @event_handler('click') on a method of a Widget. This will
     define widget.subscribers['click']. In the marked method, call
-    the subscribers. The method will be called when the event is triggered.
+    the subscribers with self.notify('click', msg). The method will be
+    called when the event is triggered.
 
     Others can subscribe via widget.register('click', callback).
 
+    The method can be a coroutine function (async def). It is then
+    run on the IOLoop without blocking other events (See Widget.schedule()).
+
     :param args:
     :return:
     """
 
     def decorator(f):
-        # print(f'decorator({f})')
         f.event_register = tuple(args)
         return f
 
     return decorator
 
 
+def increasing_subsequence(seq: List[int]) -> List[int]:
+    """
+    Longest increasing subsequence of a sequence of distinct integers.
+    O(n log n).
+
+    :param seq: Sequence of distinct integers.
+    :return: Indexes in seq of the elements in the subsequence.
+    """
+    tails = []  # tails[k]: Index in seq of the smallest tail of length k + 1.
+    previous = [-1] * len(seq)
+    for i, x in enumerate(seq):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if seq[tails[mid]] < x:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo > 0:
+            previous[i] = tails[lo - 1]
+        if lo == len(tails):
+            tails.append(i)
+        else:
+            tails[lo] = i
+
+    result = []
+    i = tails[-1] if tails else -1
+    while i != -1:
+        result.append(i)
+        i = previous[i]
+    return result[::-1]
+
+
+def diff_children(old: List, new: List) -> List[tuple]:
+    """
+    Operations that turn the list of widgets old into new. Widgets
+    are compared by identity.
+
+    * ('remove', widget): Widget in old but not in new.
+    * ('insert', widget, before): Widget in new but not in old.
+    * ('move', widget, before): Widget in both that changed position.
+
+    before is the widget the inserted or moved widget goes in front of,
+    or None for the end of the list. Operations are meant to be applied
+    in order. Widgets in the longest run that keeps its relative order
+    are not moved, so only the minimum of moves is produced.
+
+    :param old: Old list of widgets.
+    :param new: New list of widgets, without repetitions.
+    :return: List of operations.
+    """
+    new_ids = set(map(id, new))
+    ops = [('remove', w) for w in old if id(w) not in new_ids]
+
+    old_position = {id(w): i for i, w in enumerate(old)}
+    kept = [w for w in new if id(w) in old_position]
+    stable = {id(kept[i]) for i in
+              increasing_subsequence([old_position[id(w)] for w in kept])}
+
+    # Right to left, so that the widget to go in front of is already in place.
+    placements = []
+    before = None
+    for w in reversed(new):
+        if id(w) not in old_position:
+            placements.append(('insert', w, before))
+        elif id(w) not in stable:
+            placements.append(('move', w, before))
+        before = w
+
+    return ops + placements
+
+
 class LoudDict(dict):
     """
     A Dictionary with a callback for
@@ -164,6 +258,82 @@ class LoudDict(dict):
             self.__setitem__(key, value)
 
 
+class IdentifierAllocator:
+    """
+    Hands out short, unique widget identifiers: a prefix followed
+    by a base 36 counter (w1, w2, ..., wz, w10, ...).
+
+    Each connection has its own allocator, which is active while the
+    app is created and while it handles messages (See activate()).
+    Widgets created at any other time get their identifiers from
+    default_allocator, which uses a different prefix.
+    """
+
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+    def __init__(self, prefix: str = 'w'):
+        self.prefix = prefix
+        self._count = count(1)
+
+    def __call__(self) -> str:
+        """
+        :return: A new identifier.
+        """
+        n = next(self._count)
+        digits = self.digits
+        chars = []
+        while n:
+            n, r = divmod(n, 36)
+            chars.append(digits[r])
+        return self.prefix + ''.join(reversed(chars))
+
+    @contextmanager
+    def activate(self):
+        """
+        Context manager. Widgets created inside get their
+        identifiers from this allocator.
+        """
+        stack = _active_allocators.__dict__.setdefault('stack', [])
+        stack.append(self)
+        try:
+            yield self
+        finally:
+            stack.pop()
+
+
+_active_allocators = threading.local()
+
+default_allocator = IdentifierAllocator('g')
+"""Used when no allocator is active."""
+
+
+def current_allocator() -> IdentifierAllocator:
+    """
+    :return: The active identifier allocator in this thread,
+        or default_allocator.
+    """
+    stack = getattr(_active_allocators, 'stack', None)
+    return stack[-1] if stack else default_allocator
+
+
+_tasks = set()
+"""Handlers running asynchronously (See Widget.schedule()). The
+event loop keeps only weak references to tasks."""
+
+max_widget_types = 1024
+"""Most widget types kept in widget_types. The least recently used
+ones are evicted, so that widgets whose definitions differ per
+instance (e.g. generated templates) do not fill the memory."""
+
+widget_types = {}
+"""Widget definitions by type identifier. See Widget.type_id()."""
+
+_type_ids = OrderedDict()
+"""Type identifiers by the static parts of the widgets, least
+recently used first."""
+_type_allocator = IdentifierAllocator('t')
+
+
 class OrfanWidgetError(Exception):
     pass
 
@@ -207,8 +377,9 @@ class Widget:
         """Whether the JS widget should send the server a
         message to notify the change in its model (properties)."""
 
-        self.identifier = identifier or self.__class__.__name__ + '-' + ''.join(choice(letter) for _ in range(10))
-        """Unique identifier to find the browser counterpart."""
+        self.identifier = identifier or current_allocator()()
+        """Unique identifier to find the browser counterpart.
+        See IdentifierAllocator."""
 
         self.browser_side_ready = False
 
@@ -217,9 +388,9 @@ class Widget:
         which sends the message to the browser.
         """
 
-        self.descendent_index = {}
-        """Index for fast lookup of children.
-        TODO: Check if this contains only children or all descendents."""
+        self._app = None
+        """The app this widget is attached to, if any. Set by
+        MainApp.register()."""
 
         self._children = NotifyList2([])
         """For composite widgets."""
@@ -283,34 +454,61 @@ class Widget:
         self._jscustomMethods = {}
         """Defines Javascript widget methods that can be called from Python."""
 
-        # Process methods marked as event handlers
+        # Bind the methods marked as event handlers
         # (Decorated with @event_handler('event_name')).
-        # See self._jshandlers.
-        for method_name in dir(self):
+        # The table is built once per class. See self._event_handler_table().
+        for event_name, method_name in self._event_handler_table().items():
+            self.local_event_handlers[event_name] = getattr(self, method_name)
+            self.subscribers[event_name] = []
 
-            # Skip properties
-            if isinstance(getattr(self.__class__, method_name, None), property):
-                continue
+        # self.children = [] if len(args) == 0 else args[1]  # This will trigger a message, even if empty.
 
-            method = getattr(self, method_name)
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Catch duplicate handlers when the class is defined.
+        cls._event_handler_table()
 
-            # Methods only.
-            if callable(method) and not method_name.startswith('__'):  # It's a method.
-                try:
-                    # This will raise AttributeError if not a callback.
-                    # (Event handlers have attribute event_register which is a tuple).
-                    event_name = method.event_register[0]
+    @classmethod
+    def _event_handler_table(cls):
+        """
+        Finds the methods of this class marked with @event_handler.
+        The result is computed once per class and saved in the class.
 
-                    if event_name in self.local_event_handlers:
-                        raise TypeError(f'Event "{event_name}" of {repr(self)} already has a handler.')
+        A method overridden in a subclass without the decorator is
+        no longer an event handler.
 
-                    self.local_event_handlers[event_name] = method
-                    self.subscribers[event_name] = []
-                    print(f'{self.__class__.__name__}: Registered event "{event_name}"')
-                except AttributeError:  # Does not have 'event_register'
-                    pass
+        :return: Dictionary of method names by event name.
+        """
+        table = cls.__dict__.get('_event_handlers')
+        if table is not None:
+            return table
 
-        # self.children = [] if len(args) == 0 else args[1]  # This will trigger a message, even if empty.
+        table = {}
+        events_by_name = {}
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if name.startswith('__'):
+                    continue
+
+                if name in events_by_name:  # Overridden.
+                    del table[events_by_name.pop(name)]
+
+                # Unwrap staticmethod and classmethod.
+                event_register = getattr(getattr(attr, '__func__', attr),
+                                         'event_register', None)
+                if event_register is None or isinstance(attr, property):
+                    continue
+
+                event_name = event_register[0]
+                if event_name in table:
+                    raise TypeError(f'Event "{event_name}" of {cls.__name__} '
+                                    f'already has a handler.')
+                table[event_name] = name
+                events_by_name[name] = event_name
+
+        logger.debug('%s: Event handlers %s', cls.__name__, table)
+        cls._event_handlers = table
+        return table
 
     def __setattr__(self, key, value):
         """
@@ -355,7 +553,8 @@ class Widget:
         is set as a callback for changes. This same method is called
         after the list is set.
 
-        TODO: Make sure the new value is different.
+        Children that are not in the new list are detached (See
+        detach_child()).
 
         :param value: List of children.
         :return: None
@@ -370,12 +569,19 @@ class Widget:
             if not isinstance(child, Widget):
                 raise NotWidgetError(f'{child} is not a widget.')
 
+        old_children = self._children
+
         self._children = NotifyList2(value)
         # What to do when we make changes to self._children.
         self._children._on_append_callbacks.append(self.on_children_append)
         self._children._on_remove_callbacks.append(self.on_children_remove)
 
-        self.on_children_change()
+        kept = set(map(id, self._children))
+        for child in old_children:
+            if id(child) not in kept:
+                self.detach_child(child)
+
+        self.on_children_change(old_children)
 
     @property
     def parent(self):
@@ -384,69 +590,53 @@ class Widget:
     @parent.setter
     def parent(self, p):
         """
-        Sets the parent attribute and updates the parent with
-        all known descendents.
+        Sets the parent attribute. If the parent is attached to
+        an app, this widget and its descendents are registered
+        with the app.
 
         :param p: Parent widget.
         :return: None
         """
         self._parent = p
-        self.parent.update_descendents(self, self.descendent_index)
+        if p is not None and p.app is not None:
+            p.app.register(self)
 
-    def update_descendents(self, *args):
+    @property
+    def app(self):
         """
-        Called by children when adopted to notify about all
-        known descendents. In turn, forwards this information
-        to this widgent's parent and should bubble up to the main app.
-
-        :param args: Widget, Dictionary of widgets by identifier or List of Widgets.
-        :return: None
+        The app (MainApp) this widget is attached to, or None
+        if it is not attached to one yet.
         """
-        print(f'{self.__class__.__name__}.update_descendents()')
-
-        for branch in args:
-            if isinstance(branch, Widget):
-                self.descendent_index[branch.identifier] = branch
-            elif isinstance(branch, dict):
-                self.descendent_index.update(branch)
-            elif isinstance(branch, list):
-                for w in branch:
-                    self.descendent_index[w.identitier] = w
-            else:
-                raise TypeError("Cannot update descendent from type {}".format(type(branch)))
-
-        try:
-            self.parent.update_descendents(self.descendent_index)
-        except AttributeError:
-            print(f"[{self.identifier}] This widget does not have a parent to notify about descendents.")
+        return self._app
 
     def template(self):
         return self.template_txt
 
-    def on_children_change(self):
+    def on_children_change(self, old_children=()):
         """
         Called when the children attribute is assigned.
 
         * Children are "adopted", i.e. their parent property is set to this widget.
-        * Triggers a call to self.update_descendents(). Actually,
-          each child calls it when it detects that its 'parent' member is
-          being set.
-        * Sends the children to the browser.
+          If this widget is attached to an app, the children are registered
+          with the app (See MainApp.register()).
+        * Sends the children to the browser. If some of the old children
+          are still there, only the changes are sent (See send_children_ops()).
 
+        :param old_children: Children before the assignment.
         :return: None
         """
 
         # Adopt children
-        print(f'{repr(self)} adopting children:')
+        logger.debug('%r adopting children.', self)
         for child in self.children:
-            print(f'   {repr(child)} adopted.')
-            child.parent = self  # Invokes child.parent.update_descendents().
+            child.parent = self  # Registers the child with the app.
 
         # Notify the client if it is ready. If we do it before it is ready,
         # the messages will be queued and then this will happen twice when
         # it becomes ready.
         if self.browser_side_ready:
-            # self.on_children()
+            if self.send_children_ops(old_children):
+                return
             self.send_children()
 
     def on_children_append(self, *args, **kwargs):
@@ -464,17 +654,19 @@ class Widget:
             raise NotWidgetError(f'{child} is not a Widget.')
 
         # Adopt the child
-        print(f'{repr(self)} adopting child: {repr(child)}')
+        logger.debug('%r adopting child: %r', self, child)
         child.parent = self
 
-        self.message({'event': 'append', 'child': child.toJSON()})
+        # If the browser side is not ready, the child will be
+        # sent with the rest of the children when it is.
+        if self.browser_side_ready:
+            self.message({'event': 'append', 'child': child.toJSON()})
 
     def on_children_remove(self, *args, **kwargs):
         """
-        Called when this.children.remove() is called. Notifies the
-        browser of the removal.
-
-        TODO: Not yet implemented.
+        Called when this.children.remove() is called. Detaches the
+        child (See self.detach_child()) and notifies the browser of
+        the removal.
 
         :param args:
         :param kwargs:
@@ -482,10 +674,30 @@ class Widget:
         """
 
         child = args[0]
-        try:
+        self.detach_child(child)
+
+        if self.browser_side_ready:
             self.message({'event': 'remove', 'childid': child.identifier})
-        except OrfanWidgetError:
-            print("Temporarily allowing OrfanWidgetError!")
+
+    def detach_child(self, child):
+        """
+        Releases a child that is no longer in self.children. The
+        child and its descendents are removed from the app's registry
+        (See MainApp.unregister()) and the child's parent is cleared.
+
+        Nothing is done if the child has been adopted by another
+        widget in the meantime.
+
+        :param child: Former child.
+        :return: None
+        """
+
+        if child.parent is not self:
+            return
+
+        child._parent = None
+        if child.app is not None:
+            child.app.unregister(child)
 
     def __repr__(self):
         return f'{self.__class__.__name__}(id="{self.identifier}")'
@@ -501,48 +713,93 @@ class Widget:
         :param message:
         :return:
         """
-        print(f'{repr(self)}.on_message()')
-        # print(f'   says: {message}')
-
         if 'event' in message and message['event'] in self.local_event_handlers:
-            print(f'   Forwarding to \"{message["event"]}\" event handler.')
-            self.local_event_handlers[message['event']](message)
+            logger.debug('%r.on_message(): Forwarding to "%s" event handler.',
+                         self, message['event'])
+            self.schedule(self.local_event_handlers[message['event']](message))
+
+    def notify(self, event, message):
+        """
+        Calls the subscribers of an event (See self.register()) with
+        this widget and the message. Subscribers can be coroutine
+        functions (async def), in which case they are scheduled to
+        run on the IOLoop (See self.schedule()).
+
+        :param event: Name of the event.
+        :param message: Message that triggered the event.
+        :return: None
+        """
+        for subscriber in self.subscribers[event]:
+            self.schedule(subscriber(self, message))
+
+    def schedule(self, result):
+        """
+        Runs the result of a handler on the IOLoop if it is awaitable
+        (i.e. the handler was a coroutine function). The caller does not
+        wait for it, so other events and sessions are handled while it
+        awaits. Exceptions are logged.
+
+        :param result: What the handler returned.
+        :return: result
+        """
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            _tasks.add(task)
+            task.add_done_callback(self._on_task_done)
+        return result
+
+    def offload(self, fn: Callable, *args, pool: Union[str, Executor] = 'thread', **kwargs):
+        """
+        Runs fn(*args, **kwargs) in a pool of threads or processes,
+        without blocking the IOLoop (See jibe.executor). At most
+        MainApp.max_offloaded functions of the same app run at a time.
+
+        Use the result on the loop, e.g. in an async handler:
+
+            self.label.value = await self.offload(compute, data)
+
+        :param fn: Function to run. Picklable for the process pool.
+        :param pool: 'thread', 'process' or an executor.
+        :return: Future with the result of fn.
+        """
+        app = self.app
+        semaphore = None if app is None else app.offload_semaphore
+        return offload(fn, *args, pool=pool, semaphore=semaphore, **kwargs)
+
+    def _on_task_done(self, task):
+        _tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('Asynchronous handler of %r failed.', self,
+                         exc_info=task.exception())
 
     def message(self, message):
         """
-        Send a message to this widget's browser side.
+        Send a message to this widget's browser side. The browser
+        routes it by its 'id'.
 
         :param message:
-        :return:
+        :return: None, or a future to await before sending more
+            messages (See MainApp.overflow_policy).
         """
 
         message['id'] = self.identifier
-        message['path'] = []
-        self.deliver(message)
+        return self.deliver(message)
 
     def deliver(self, message):
         """
         Passes a message to the parent to be delivered to the Browser.
 
         :param message:
-        :return:
+        :return: What MainApp.deliver() returns, or None if the
+            message is kept in self.outbox.
         """
-        print(f'{self.__class__.__name__}.deliver()')
-
-        # Queued messages will re-attempt delivery so the
-        # identifier will already be attached to the path.
-        if len(message['path']) == 0 or message['path'][0] != self.identifier:
-            message['path'].insert(0, self.identifier)
-
         if not self.browser_side_ready:
             # TODO: self.outbox could possibly be "append-aware" and have the
             #   if/else logic (see above and below) in a callback.
             self.outbox.append(message)
-            # print(f'   Appended to outbox: {message}')
         else:
             try:
-                self.parent.deliver(message)
-                print(f'   Passed to parent: {message["event"]}')
+                return self.parent.deliver(message)
             except AttributeError:
                 raise OrfanWidgetError(
                     f'This widget is not attached to an app: {repr(self)}'
@@ -553,6 +810,7 @@ class Widget:
         Register the event handler for the specified event (message).
         The handler receives two parameters, the widget
         generating the event and the message from the server.
+        It can be a coroutine function (async def). See self.notify().
 
         :param event: Name of the event
         :param handler: Callable.
@@ -576,7 +834,7 @@ class Widget:
         :param msg: Message from the browser
         :return: None
         """
-        print(f"{self.__class__.__name__}.on_children(...)")
+        logger.debug('%s.on_children()', self.__class__.__name__)
         self.send_children()
 
     def send_children(self):
@@ -589,6 +847,40 @@ class Widget:
             child.toJSON() for child in self.children
         ]})
 
+    def send_children_ops(self, old_children) -> bool:
+        """
+        Sends the browser the operations that turn old_children into
+        self.children (See diff_children()), so the widgets that
+        remain are kept in the browser, only moved if needed.
+
+        Nothing is sent if no old child remains, since then it is no
+        better than sending all the children (See send_children()).
+
+        :param old_children: Children before they were changed.
+        :return: True if the changes were sent (or there were none),
+            False if send_children() should be used instead.
+        """
+        children = self.children
+        new_ids = set(map(id, children))
+        if len(new_ids) < len(children) or not any(id(child) in new_ids for child in old_children):
+            return False
+
+        ops = []
+        for op in diff_children(old_children, children):
+            if op[0] == 'remove':
+                ops.append({'op': 'remove', 'childid': op[1].identifier})
+                continue
+            entry = {'op': op[0], 'before': None if op[2] is None else op[2].identifier}
+            if op[0] == 'insert':
+                entry['child'] = op[1].toJSON()
+            else:
+                entry['childid'] = op[1].identifier
+            ops.append(entry)
+
+        if ops:
+            self.message({'event': 'children_ops', 'ops': ops})
+        return True
+
     @event_handler("started")
     def on_browser_side_ready(self, msg):
         """
@@ -628,24 +920,69 @@ class Widget:
         """
         JSON representation of the object.
 
+        The static part of the widget (template, Javascript code, etc.)
+        is not included. It is referenced by 'type'. See self.type_id().
+
         :return: JSON-compatible object representation of this widget.
         """
 
         return {
             'id': self.identifier,
+            'type': self.type_id(),
             'properties': self.properties,  # "model"
             'attributes': self.attributes,
             'style': self.style,
+            'renderOnChange': self.renderOnChange,
+            'notifyServerOnChange': self.notifyServerOnChange
+        }
+
+    def definition(self):
+        """
+        The static part of the JSON representation of this widget,
+        which is the same for all widgets of the same type. It is sent
+        to the browser once per connection.
+
+        :return: JSON-compatible dictionary.
+        """
+
+        return {
             'tagName': self.tagname,
             'className': self.classname,
-            'template': self.template(),  # TODO: Why call?
-            'handlers': self._jshandlers,
+            'template': self.template(),
+            'handlers': dict(self._jshandlers),
             'render': self._jsrender,
-            'renderOnChange': self.renderOnChange,
-            'notifyServerOnChange': self.notifyServerOnChange,
-            'customMethods': self._jscustomMethods
+            'customMethods': dict(self._jscustomMethods)
         }
 
+    def type_id(self):
+        """
+        Identifier of the type of this widget in widget_types. Widgets
+        with identical definitions (See self.definition()) share
+        the same type, even if they are of different classes.
+        A type that was evicted from widget_types (See
+        max_widget_types) gets a new identifier when used again.
+
+        :return: Type identifier.
+        """
+
+        key = (self.tagname, self.classname, self.template(), self._jsrender,
+               tuple(self._jshandlers.items()),
+               tuple(self._jscustomMethods.items()))
+        try:
+            type_id = _type_ids[key]
+            _type_ids.move_to_end(key)
+            return type_id
+        except KeyError:
+            pass
+
+        type_id = _type_allocator()
+        widget_types[type_id] = self.definition()
+        _type_ids[key] = type_id
+        while len(_type_ids) > max_widget_types:
+            _, evicted = _type_ids.popitem(last=False)
+            widget_types.pop(evicted, None)
+        return type_id
+
     def serialize(self):
         """
         Returns a string with a JSON representation of this widget.
@@ -662,7 +999,7 @@ class Widget:
         :param oldval: Previous value of the property.
         :returns: None
         """
-        print(f"{self.__class__.__name__}.on_change('{propname}')")
+        logger.debug("%s.on_change('%s')", self.__class__.__name__, propname)
         self.message({'event': 'properties',
                       'properties': {propname: newval}})
 
@@ -746,10 +1083,9 @@ class Button(Widget):
         :param msg:
         :return:
         """
-        print(f'{self.__class__.__name__}.on_click()')
-        print(f'{len(self.subscribers["click"])} subscribers.')
-        for subscriber in self.subscribers['click']:
-            subscriber(self, msg)
+        logger.debug('%s.on_click(): %d subscribers.',
+                     self.__class__.__name__, len(self.subscribers['click']))
+        self.notify('click', msg)
 
 
 class Input(Widget):
@@ -804,15 +1140,15 @@ class Input(Widget):
         :param message:
         :return:
         """
-        print(f'{self.__class__.__name__}.on_change_msg({message})')
+        if log.log_bodies and logger.isEnabledFor(log.DEBUG):
+            logger.debug('%s.on_change_msg(%s)', self.__class__.__name__, message)
 
         # Use super().__setattr__ if you don't want to send an
         # update to the browser.
         # super().__setattr__('value', msg['properties']['value'])
         self.value = message['properties']['value']
 
-        for subscriber in self.subscribers['change']:
-            subscriber(self, message)
+        self.notify('change', message)
 
 
 class TextArea(Widget):
@@ -867,15 +1203,15 @@ class TextArea(Widget):
         :param message:
         :return:
         """
-        print(f'{self.__class__.__name__}.on_change_msg({message})')
+        if log.log_bodies and logger.isEnabledFor(log.DEBUG):
+            logger.debug('%s.on_change_msg(%s)', self.__class__.__name__, message)
 
         # Use super().__setattr__ if you don't want to send an
         # update to the browser.
         # super().__setattr__('value', msg['properties']['value'])
         self.value = message['properties']['value']
 
-        for subscriber in self.subscribers['change']:
-            subscriber(self, message)
+        self.notify('change', message)
 
 
 class SelectMultiple(Widget):
@@ -989,13 +1325,13 @@ class Dropdown(Widget):
         :param msg:
         :return:
         """
-        print(f'{self.__class__.__name__}.on_change_msg({msg})')
+        if log.log_bodies and logger.isEnabledFor(log.DEBUG):
+            logger.debug('%s.on_change_msg(%s)', self.__class__.__name__, msg)
 
         self.value = msg['properties']['value']
 
         # super().__setattr__('value', msg['properties']['value'])
-        for subscriber in self.subscribers['change']:
-            subscriber(self, msg)
+        self.notify('change', msg)
 
 
 class Label(Widget):
@@ -1094,34 +1430,251 @@ class CheckBox(Widget):
         :param msg:
         :return:
         """
-        print(f'{self.__class__.__name__}.on_change_msg({msg})')
+        if log.log_bodies and logger.isEnabledFor(log.DEBUG):
+            logger.debug('%s.on_change_msg(%s)', self.__class__.__name__, msg)
 
         # This will trigger a message back to the browser but wont
         # trigger another change event there.
         self.checked = msg['properties']['checked']
 
-        print(f'{len(self.subscribers["change"])} subscribers.')
-        for subscriber in self.subscribers['change']:
-            subscriber(self, msg)
+        self.notify('change', msg)
 
 
 class Image(Widget):
+    """
+    An image. Represents an <img> element.
+
+    The image is set by assigning to 'data' the image as bytes (or
+    as a base64-encoded string). How the bytes reach the browser
+    depends on the transport:
+
+    * 'url' (default): The bytes are put in a BlobStore and the
+      src of the image is set to their URL (See jibe.blobstore).
+      Identical images are sent only once and cached by the browser.
+      The image is pinned in the store while the widget shows it.
+    * 'frame': The bytes go in a binary WebSocket frame (See
+      MainApp.flush()). Nothing is stored. Better for images that
+      are rarely shown twice, like the frames of an animation.
+    """
+
+    def __init__(self, mime: str = 'image/png', transport: str = 'url',
+                 store: Optional[BlobStore] = None, **kwargs):
+        """
+        Creates an Image.
+
+        :param mime: MIME type of the image data.
+        :param transport: 'url' or 'frame'. See Image.
+        :param store: BlobStore for the 'url' transport. Default is
+            None, for jibe.blobstore.default_store.
+        :param kwargs: Additional parameters to pass to the
+            Widget class constructor.
+        """
+        if transport not in ('url', 'frame'):
+            raise ValueError(f'Unknown Image transport: {transport}')
 
-    def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        self._data = ''
+        self._data = None
+        """The image, for the 'frame' transport."""
+
+        self.key = None
+        """Key of the image in self.store, for the 'url' transport."""
+
+        self._unpin = None
+        """Unpins self.key when called or when this widget is collected."""
+
+        self.mime = mime
+        self.transport = transport
+        self.store = default_store if store is None else store
         self.tagname = 'img'
 
     @property
-    def data(self):
-        return self._data
+    def data(self) -> Optional[bytes]:
+        """
+        The image.
+        """
+        if self.key is None:
+            return self._data
+        blob = self.store.get(self.key)
+        return None if blob is None else blob[0]
 
     @data.setter
     def data(self, value):
-        self._data = value
-        self.message({'event': 'attr',
-                      'attr': {'src': f'data:image/png;base64,{value}'}})
+        if isinstance(value, str):
+            value = base64.b64decode(value)
+
+        if self.transport == 'frame':
+            self._data = bytes(value)
+            self.message({'event': 'blob',
+                          'blob': {'data': self._data, 'mime': self.mime}})
+            return
+
+        self.key = self.store.put(value, self.mime, pin=True)
+        if self._unpin is not None:
+            self._unpin()
+        self._unpin = weakref.finalize(self, self.store.unpin, self.key)
+        src = self.store.url(self.key)
+        self.attributes['src'] = src
+        self.message({'event': 'attr', 'attr': {'src': src}})
+
+    @event_handler("started")
+    def on_browser_side_ready(self, msg):
+        """
+        Overrides Widget.on_browser_side_ready(). With the 'frame'
+        transport the image is not part of the widget's JSON, so it
+        is sent again whenever the widget is (re)created in the browser.
+
+        :param msg: Message from the browser
+        :return: None
+        """
+        super().on_browser_side_ready(msg)
+        if self.transport == 'frame' and self._data is not None:
+            self.message({'event': 'blob',
+                          'blob': {'data': self._data, 'mime': self.mime}})
+
+
+def render_figure(draw: Callable, figsize: tuple, dpi: float, fmt: str,
+                  args: tuple, kwargs: dict) -> bytes:
+    """
+    Creates a Matplotlib figure, draws on it and saves it.
+
+    A new figure is made every time, so nothing is shared between
+    renders and this can run in any thread, or in another process
+    (draw must then be picklable, e.g. a module-level function).
+
+    :param draw: Function that draws. Receives the figure, args and kwargs.
+    :param figsize: Size of the figure in inches.
+    :param dpi: Dots per inch.
+    :param fmt: Image format, like 'png' or 'svg'.
+    :param args: Positional arguments for draw.
+    :param kwargs: Keyword arguments for draw.
+    :return: The image.
+    """
+    # Imported here so Matplotlib is only needed if figures are used.
+    from matplotlib.figure import Figure as MPLFigure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = MPLFigure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    draw(figure, *args, **kwargs)
+    image = BytesIO()
+    figure.savefig(image, format=fmt)
+    return image.getvalue()
+
+
+class Figure(Image):
+    """
+    Image of a Matplotlib figure, rendered in a pool of threads (or
+    processes), so the IOLoop is not blocked while rendering.
+
+    The figure is drawn by a function, draw(figure, *args, **kwargs).
+    Call self.update(*args, **kwargs) to render it. If updates are
+    requested faster than they are rendered, only the latest one is
+    rendered once the current render is done. The ones in between
+    are dropped. The finished image is assigned to self.data on
+    the IOLoop.
+
+    Requires Matplotlib.
+    """
+
+    renderer = staticmethod(render_figure)
+    """Function that renders the image. See render_figure()."""
+
+    def __init__(self, draw: Callable, *args, figsize: tuple = (6, 4),
+                 dpi: float = 100, fmt: str = 'png',
+                 executor: Optional[Executor] = None, **kwargs):
+        """
+        Creates a Figure and renders it with args.
+
+        :param draw: Function that draws the figure. Receives a
+            matplotlib.figure.Figure and the arguments to update().
+        :param args: Arguments for the first render.
+        :param figsize: Size of the figure in inches.
+        :param dpi: Dots per inch.
+        :param fmt: Image format, like 'png' or 'svg'.
+        :param executor: Executor to render in. Default is None, for
+            the 'thread' pool (See jibe.executor).
+        :param kwargs: Additional parameters to pass to the
+            Image class constructor.
+        """
+        mime = mimetypes.guess_type(f'figure.{fmt}')[0] or 'application/octet-stream'
+        super().__init__(mime=mime, **kwargs)
+
+        self.draw = draw
+        self.figsize = figsize
+        self.dpi = dpi
+        self.fmt = fmt
+        self._executor = executor
+
+        self.attributes['width'] = str(figsize[0] * dpi)
+        self.attributes['height'] = str(figsize[1] * dpi)
+
+        self.rendering = False
+        """Whether a render is in progress."""
+
+        self._next = None
+        """(args, kwargs) of the latest update requested while rendering."""
+
+        self.dropped = 0
+        """Number of updates that were never rendered."""
+
+        self._io_loop = tornado.ioloop.IOLoop.current()
+
+        self.update(*args)
+
+    @property
+    def io_loop(self) -> tornado.ioloop.IOLoop:
+        """
+        Loop on which the image is updated: the app's, once the figure
+        is attached, or the one it was created on until then.
+        """
+        app = self.app
+        return self._io_loop if app is None else app.io_loop
+
+    def update(self, *args, **kwargs):
+        """
+        Renders the figure with draw(figure, *args, **kwargs), now or
+        after the render in progress. Returns immediately. It can be
+        called from any thread.
+
+        :return: None
+        """
+        io_loop = self.io_loop
+        if tornado.ioloop.IOLoop.current(instance=False) is not io_loop:
+            io_loop.add_callback(self.update, *args, **kwargs)
+            return
+
+        if self.rendering:
+            if self._next is not None:
+                self.dropped += 1
+            self._next = (args, kwargs)
+            return
+        self._render(args, kwargs)
+
+    def _render(self, args: tuple, kwargs: dict):
+        executor = self._executor or get_executor('thread')
+
+        self.rendering = True
+        io_loop = self.io_loop
+        future = io_loop.run_in_executor(
+            executor, self.renderer, self.draw, self.figsize, self.dpi, self.fmt, args, kwargs)
+        io_loop.add_future(future, self._on_rendered)
+
+    def _on_rendered(self, future):
+        """
+        Called on the IOLoop when a render is done. Shows the image and
+        starts the latest update requested meanwhile, if any.
+        """
+        self.rendering = False
+        try:
+            self.data = future.result()
+        except Exception:
+            logger.exception('%r failed to render.', self)
+
+        if self._next is not None:
+            args, kwargs = self._next
+            self._next = None
+            self._render(args, kwargs)
 
 
 class ProgressBar(Div):
@@ -1190,8 +1743,6 @@ class ProgressBar(Div):
         """
         super().on_change(propname, newval, oldval)
 
-        print(f"{self.__class__.__name__}.on_change('{propname}')")
-
         # Don't go past 100.
         value = self.value if self.value <= 100 else 100
 
@@ -1204,6 +1755,545 @@ class ProgressBar(Div):
         })
 
 
+class VirtualList(Widget):
+    """
+    A scrollable list for a large number of rows. Rows are widgets,
+    created with row_factory from the items in a sequence (source),
+    but only those in the browser's viewport, plus some overscan,
+    exist at any time, both in Python and in the browser.
+
+    The browser reports the visible range of rows as the user
+    scrolls ('viewport' event) and the rows that leave the range
+    are replaced with those that enter it. If update_row is given,
+    the widgets of the rows that leave are reused for the rows that
+    enter (only their properties and position change). Otherwise
+    new widgets are created.
+
+    All rows have the same height and are absolutely positioned.
+
+    Properties: rowHeight, scrollHeight (total height of the rows).
+
+    Events: viewport - The range of visible rows changed.
+    """
+
+    def __init__(self, source: Sequence, row_factory: Callable[[Any], Widget],
+                 update_row: Optional[Callable[[Widget, Any], None]] = None,
+                 row_height: int = 30, height: int = 400, overscan: int = 10,
+                 **kwargs):
+        """
+        Creates a VirtualList.
+
+        :param source: Items of the list. Anything with len() and
+            indexing by integer.
+        :param row_factory: Function that creates the widget of a
+            row from an item.
+        :param update_row: Function that changes the widget of a row
+            to show a different item. Receives the widget and the
+            item. Default is None (Widgets are not reused).
+        :param row_height: Height of a row in pixels.
+        :param height: Height of the list in pixels.
+        :param overscan: Number of rows to keep above and below the
+            visible ones.
+        :param kwargs: Additional parameters to pass to the
+            Widget class constructor.
+        """
+        style = {
+            'position': 'relative',
+            'overflow-y': 'auto',
+            'height': f'{height}px'
+        }
+        if 'style' in kwargs:
+            style.update(kwargs['style'])
+            del kwargs['style']
+
+        super().__init__(style=style, **kwargs)
+
+        self.source = source
+        self.row_factory = row_factory
+        self.update_row = update_row
+        self.overscan = overscan
+
+        self.properties['rowHeight'] = row_height
+        self.properties['scrollHeight'] = len(source) * row_height
+
+        self._rows = {}
+        """Widgets of the rows in the window, by index in source."""
+
+        self._window = None
+        """Range of rows in self._rows, (start, stop)."""
+
+        self._viewport = None
+        """Range of visible rows, (first, last). See self.show()."""
+
+        self.template_txt = '<div class="virtuallist-spacer" style="height: {{ scrollHeight }}px"></div>'
+
+        # Report the range of visible rows, at most once per frame
+        # and only when it changes.
+        self._jshandlers['scroll'] = """
+            let rowHeight = this.model.get('rowHeight');
+            this._viewport = [
+                Math.floor(this.el.scrollTop / rowHeight),
+                Math.ceil((this.el.scrollTop + this.el.clientHeight) / rowHeight)
+            ];
+            if (this._viewportPending) {
+                return;
+            }
+            this._viewportPending = true;
+            requestAnimationFrame(() => {
+                this._viewportPending = false;
+                let [first, last] = this._viewport;
+                if (this._sentViewport === undefined ||
+                        first !== this._sentViewport[0] || last !== this._sentViewport[1]) {
+                    this._sentViewport = this._viewport;
+                    this.message({event: 'viewport', first: first, last: last});
+                }
+            });
+        """
+
+        self.show(0, -(-height // row_height))
+
+    @event_handler('viewport')
+    def on_viewport(self, msg):
+        """
+        The range of rows visible in the browser changed.
+
+        :param msg: Message with 'first' and 'last' (exclusive) rows.
+        :return: None
+        """
+        self.show(msg['first'], msg['last'])
+
+        self.notify('viewport', msg)
+
+    def show(self, first: int, last: int):
+        """
+        Makes the rows from first to last (exclusive), plus the
+        overscan, the rows of the list.
+
+        :param first: First visible row.
+        :param last: Row after the last visible one.
+        :return: None
+        """
+        self._viewport = (first, last)
+        total = len(self.source)
+        start = max(0, min(first, total) - self.overscan)
+        stop = max(start, min(total, last + self.overscan))
+        if (start, stop) == self._window:
+            return
+        self._window = (start, stop)
+
+        rows = self._rows
+        free = [rows.pop(i) for i in [i for i in rows if not start <= i < stop]]
+
+        created = []
+        for i in range(start, stop):
+            if i in rows:
+                continue
+            if free and self.update_row is not None:
+                row = free.pop()
+                self.update_row(row, self.source[i])
+                style = self._row_style(i)
+                row.style.update(style)
+                row.css(style)
+            else:
+                row = self.row_factory(self.source[i])
+                row.style.update(self._row_style(i))
+                created.append(row)
+            rows[i] = row
+
+        if free or created:
+            kept = set(map(id, rows.values()))
+            self.children = [row for row in self.children if id(row) in kept] + created
+
+    def refresh(self):
+        """
+        Shows the source again, after it changed. The rows in the
+        window are updated with update_row or created again.
+
+        :return: None
+        """
+        self.scrollHeight = len(self.source) * self.rowHeight
+        if self._viewport is None:
+            return
+
+        if self.update_row is None:
+            self._rows = {}
+        else:
+            for i, row in list(self._rows.items()):
+                if i < len(self.source):
+                    self.update_row(row, self.source[i])
+        self._window = None
+        self.show(*self._viewport)
+
+    def _row_style(self, index: int) -> dict:
+        """
+        CSS placing a row at its position in the list.
+
+        :param index: Index of the row in source.
+        :return: Style dictionary.
+        """
+        height = self.rowHeight
+        return {
+            'position': 'absolute',
+            'left': '0px',
+            'right': '0px',
+            'top': f'{index * height}px',
+            'height': f'{height}px'
+        }
+
+
+class DataTable(Widget):
+    """
+    A table over columns of data, with sorting, filtering and
+    paging done on the server. Columns are NumPy arrays, or anything
+    NumPy can make an array of (lists, objects with the buffer
+    protocol, etc.). Requires NumPy.
+
+    Sorting and filtering produce an array of row indexes (the view)
+    with vectorized operations. Only the rows of the current page are
+    sent to the browser, in a single 'page' message with a list of
+    values per column. Pending 'page' messages are merged, so only
+    the last page goes out (See MainApp.mergeable_events).
+
+    Filters are text. In columns of strings, rows containing the
+    text (ignoring case) are kept. In numeric columns, the text is a
+    number, optionally preceded by one of =, !=, <, <=, >, >=.
+
+    Events: sort, filter, goto (page).
+    """
+
+    filter_operators = {
+        '>=': 'greater_equal',
+        '<=': 'less_equal',
+        '!=': 'not_equal',
+        '>': 'greater',
+        '<': 'less',
+        '=': 'equal'
+    }
+    """Operators in numeric filters and the NumPy functions for them.
+    Longer ones go first, since they are tried in order."""
+
+    bool_values = {'true': True, 'false': False, '1': True, '0': False}
+    """Values in filters of boolean columns (case-insensitive)."""
+
+    def __init__(self, columns: Dict[str, Any], page_size: int = 50, **kwargs):
+        """
+        Creates a DataTable.
+
+        :param columns: Columns of the table by name. All must have
+            the same length.
+        :param page_size: Number of rows per page.
+        :param kwargs: Additional parameters to pass to the
+            Widget class constructor.
+        """
+        if np is None:
+            raise ImportError('DataTable requires NumPy (pip install numpy).')
+
+        super().__init__(**kwargs)
+
+        self.page_size = page_size
+        self.page = 0
+        self.sort_column = None
+        self.sort_ascending = True
+        self.filters = {}
+        """Filter text by column name."""
+
+        self.columns = {}
+        self._lowercase = {}
+        """Lowercase copies of the columns of strings, made when
+        they are first filtered."""
+
+        self._order = None
+        """Sort order of all rows for (self.sort_column, self.sort_ascending),
+        as ((column, ascending), indexes). Kept so that changing the
+        filters does not sort again."""
+
+        self._view = None
+        """Indexes of the rows that pass the filters, sorted. None
+        if there are no filters and no sorting (all rows, in order)."""
+
+        self.set_data(columns)
+
+        # The page is rendered by the page() custom method, below.
+        self._jsrender = """
+            // Do nothing.
+        """
+
+        self._jscustomMethods['page'] = """
+            let page = msg.page;
+            let names = Object.keys(page.columns);
+
+            // The head of the table (names and filters) is kept
+            // between pages, so the filter inputs are not reset.
+            if (this._columnNames === undefined || !_.isEqual(this._columnNames, names)) {
+                this._columnNames = names;
+                let header = names.map(name =>
+                    `<th data-sort="${_.escape(name)}">${_.escape(name)}</th>`).join('');
+                let filters = names.map(name =>
+                    `<th><input data-filter="${_.escape(name)}" placeholder="Filter"></th>`).join('');
+                this.$el.html(
+                    `<table><thead><tr>${header}</tr><tr>${filters}</tr></thead><tbody></tbody></table>` +
+                    '<div class="datatable-pager"><button data-goto="-1">&lt;</button>' +
+                    '<span></span><button data-goto="1">&gt;</button></div>');
+                this._tbody = this.$el.find('tbody')[0];
+            }
+
+            let columns = names.map(name => page.columns[name]);
+            let n = columns.length > 0 ? columns[0].length : 0;
+            let rows = new Array(n);
+            for (let i = 0; i < n; i++) {
+                let cells = new Array(columns.length);
+                for (let j = 0; j < columns.length; j++) {
+                    cells[j] = '<td>' + _.escape(columns[j][i]) + '</td>';
+                }
+                rows[i] = '<tr>' + cells.join('') + '</tr>';
+            }
+            this._tbody.innerHTML = rows.join('');
+
+            this._page = page.number;
+            this.$el.find('.datatable-pager span').text(
+                ` Page ${page.number + 1} of ${Math.max(page.pages, 1)} (${page.rows} rows) `);
+            this.$el.find('th[data-sort]').each(function () {
+                let sorted = page.sort !== null && this.getAttribute('data-sort') === page.sort[0];
+                $(this).toggleClass('ascending', sorted && page.sort[1]);
+                $(this).toggleClass('descending', sorted && !page.sort[1]);
+            });
+        """
+
+        self._jshandlers['click'] = """
+            let target = $(event.target);
+            if (target.is('[data-sort]')) {
+                this.message({event: 'sort', column: target.attr('data-sort')});
+            } else if (target.is('[data-goto]')) {
+                this.message({event: 'goto', page: this._page + Number(target.attr('data-goto'))});
+            }
+        """
+
+        self._jshandlers['change'] = """
+            let target = $(event.target);
+            if (target.is('[data-filter]')) {
+                this.message({event: 'filter', column: target.attr('data-filter'), value: target.val()});
+            }
+        """
+
+    @property
+    def rows(self) -> int:
+        """
+        Number of rows that pass the filters.
+        """
+        if self._view is not None:
+            return len(self._view)
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @property
+    def pages(self) -> int:
+        """
+        Number of pages.
+        """
+        return -(-self.rows // self.page_size)
+
+    def set_data(self, columns: Dict[str, Any]):
+        """
+        Replaces the data in the table. Sorting and filters are kept
+        if the columns they refer to still exist.
+
+        :param columns: Columns of the table by name. All must have
+            the same length.
+        :return: None
+        """
+        columns = {name: np.asarray(column) for name, column in columns.items()}
+        if len({len(column) for column in columns.values()}) > 1:
+            raise ValueError('All the columns of a DataTable must have the same length.')
+
+        self.columns = columns
+        self._lowercase = {}
+        self._order = None
+        if self.sort_column not in columns:
+            self.sort_column = None
+        self.filters = {name: text for name, text in self.filters.items() if name in columns}
+        self.update()
+
+    def sort(self, column: Optional[str], ascending: bool = True):
+        """
+        Sorts the rows by a column. Goes to the first page.
+
+        :param column: Name of the column. None for the original order.
+        :param ascending: Whether to sort in ascending order.
+        :return: None
+        """
+        if column is not None and column not in self.columns:
+            raise KeyError(column)
+        self.sort_column = column
+        self.sort_ascending = ascending
+        self.page = 0
+        self.update()
+
+    def filter(self, column: str, text: Optional[str]):
+        """
+        Sets the filter of a column. Goes to the first page.
+
+        :param column: Name of the column.
+        :param text: Filter text (See DataTable). None or empty to
+            remove the filter.
+        :return: None
+        """
+        if column not in self.columns:
+            raise KeyError(column)
+        if text:
+            self.filters[column] = text
+        else:
+            self.filters.pop(column, None)
+        self.page = 0
+        self.update()
+
+    def goto(self, page: int):
+        """
+        Shows a page. Out of range pages are clamped.
+
+        :param page: Page number, starting at 0.
+        :return: None
+        """
+        self.page = max(0, min(page, self.pages - 1))
+        self.send_page()
+
+    def update(self):
+        """
+        Computes the rows that pass the filters, sorts them and
+        sends the current page.
+
+        :return: None
+        """
+        mask = None
+        for name, text in self.filters.items():
+            passed = self._filter_mask(name, text)
+            if passed is not None:
+                mask = passed if mask is None else mask & passed
+
+        if self.sort_column is None:
+            view = None if mask is None else np.flatnonzero(mask)
+        else:
+            key = (self.sort_column, self.sort_ascending)
+            if self._order is None or self._order[0] != key:
+                column = self.columns[self.sort_column]
+                try:
+                    order = np.argsort(column, kind='stable')
+                except TypeError:
+                    # Objects that cannot be compared, like [1, 'a', None].
+                    order = np.argsort(column.astype(str), kind='stable')
+                if not self.sort_ascending:
+                    order = order[::-1]
+                self._order = (key, order)
+            order = self._order[1]
+            view = order if mask is None else order[mask[order]]
+
+        self._view = view
+        self.page = max(0, min(self.page, self.pages - 1))
+        self.send_page()
+
+    def _filter_mask(self, name: str, text: str):
+        """
+        Rows of a column that pass a filter.
+
+        :param name: Name of the column.
+        :param text: Filter text.
+        :return: Boolean array, or None if the filter cannot be
+            applied to the column.
+        """
+        column = self.columns[name]
+        if column.dtype.kind in 'USO':
+            lowercase = self._lowercase.get(name)
+            if lowercase is None:
+                lowercase = np.char.lower(column.astype(str))
+                self._lowercase[name] = lowercase
+            return np.char.find(lowercase, text.lower()) >= 0
+
+        text = text.strip()
+        for operator, function in self.filter_operators.items():
+            if text.startswith(operator):
+                text = text[len(operator):]
+                break
+        else:
+            function = 'equal'
+
+        text = text.strip()
+        try:
+            if column.dtype.kind == 'b':
+                # np.bool_('False') is True.
+                value = self.bool_values[text.lower()]
+            else:
+                value = column.dtype.type(text)
+        except (KeyError, ValueError, OverflowError, TypeError):
+            logger.warning('Ignoring filter %r on column %r.', text, name)
+            return None
+        return getattr(np, function)(column, value)
+
+    def send_page(self):
+        """
+        Sends the rows in the current page to the browser.
+
+        :return: None
+        """
+        start = self.page * self.page_size
+        stop = start + self.page_size
+        rows = slice(start, stop) if self._view is None else self._view[start:stop]
+
+        columns = {}
+        for name, column in self.columns.items():
+            values = column[rows]
+            if values.dtype.kind in 'Mm':  # Dates and times.
+                values = values.astype(str)
+            elif values.dtype.kind == 'f' and np.isnan(values).any():
+                # Missing values go as null.
+                values = np.where(np.isnan(values), None, values.astype(object))
+            columns[name] = values.tolist()
+
+        self.message({'event': 'page', 'page': {
+            'number': self.page,
+            'pages': self.pages,
+            'rows': self.rows,
+            'sort': None if self.sort_column is None else [self.sort_column, self.sort_ascending],
+            'columns': columns
+        }})
+
+    @event_handler('sort')
+    def on_sort(self, msg):
+        """
+        A column name was clicked in the browser. Sorts by it, or
+        reverses the order if the table is already sorted by it.
+
+        :param msg: Message with 'column'.
+        :return: None
+        """
+        column = msg['column']
+        ascending = column != self.sort_column or not self.sort_ascending
+        self.sort(column, ascending)
+
+        self.notify('sort', msg)
+
+    @event_handler('filter')
+    def on_filter(self, msg):
+        """
+        A filter was changed in the browser.
+
+        :param msg: Message with 'column' and 'value'.
+        :return: None
+        """
+        self.filter(msg['column'], msg['value'])
+
+        self.notify('filter', msg)
+
+    @event_handler('goto')
+    def on_goto(self, msg):
+        """
+        Another page was requested from the browser.
+
+        :param msg: Message with 'page'.
+        :return: None
+        """
+        self.goto(msg['page'])
+
+        self.notify('goto', msg)
+
+
 class Redirect(Widget):
     """
     A widget that allows triggering a page redirection.
@@ -23,11 +23,13 @@ setup(
     packages=['jibe'],
     requires=['tornado', 'jinja2', 'matplotlib', 'numpy'],
     install_requires=['tornado', 'jinja2'],
+    extras_require={'fast': ['orjson'], 'msgpack': ['msgpack'], 'table': ['numpy']},
     python_requires='>=3.6',
     package_dir={'jibe': 'jibe'},
     package_data={'jibe': [
         'app.css',
         'app.js',
+        'msgpack.js',
         'page.html',
         'lib/backbone.js',
         'lib/handlebars.js',
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+from tornado.testing import AsyncTestCase, gen_test
+from jibe import Widget, Button, event_handler
+
+
+class Slow(Widget):
+
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    @event_handler('fetch')
+    async def on_fetch(self, msg):
+        self.log.append('start')
+        await asyncio.sleep(0.01)
+        self.log.append(msg['n'])
+
+
+class TestAsyncHandlers(AsyncTestCase):
+
+    @gen_test
+    async def test_handler(self):
+        widget = Slow()
+        widget.on_message({'id': widget.identifier, 'event': 'fetch', 'n': 1})
+        widget.on_message({'id': widget.identifier, 'event': 'fetch', 'n': 2})
+        await asyncio.sleep(0)
+        self.assertEqual(['start', 'start'], widget.log)  # Neither one blocked.
+        await asyncio.sleep(0.05)
+        self.assertEqual(['start', 'start', 1, 2], widget.log)
+
+    @gen_test
+    async def test_subscribers(self):
+        button = Button()
+        clicks = []
+
+        async def on_click(source, msg):
+            await asyncio.sleep(0)
+            clicks.append(source)
+
+        async def broken(source, msg):
+            raise RuntimeError('Subscriber failed.')
+
+        button.register('click', broken)
+        button.register('click', on_click)
+        button.register('click', lambda source, msg: clicks.append('sync'))
+
+        with self.assertLogs('jibe.widget', 'ERROR'):
+            button.on_message({'id': button.identifier, 'event': 'click'})
+            self.assertEqual(['sync'], clicks)
+            await asyncio.sleep(0.01)
+        self.assertEqual(['sync', button], clicks)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import gc
+import unittest
+from tornado.testing import AsyncHTTPTestCase
+from jibe import MainApp, Image
+from jibe.blobstore import BlobStore, default_store
+
+
+class TestBlobStore(unittest.TestCase):
+
+    def test_content_addressed(self):
+        store = BlobStore()
+        key = store.put(b'abc', 'image/png')
+        self.assertEqual(key, store.put(b'abc', 'image/png'))
+        self.assertNotEqual(key, store.put(b'abc', 'image/jpeg'))
+        self.assertEqual((b'abc', 'image/png'), store.get(key))
+        self.assertEqual(6, store.size)
+
+    def test_lru(self):
+        store = BlobStore(max_bytes=10)
+        a = store.put(b'a' * 4)
+        b = store.put(b'b' * 4)
+        store.get(a)
+        c = store.put(b'c' * 4)
+        self.assertIn(a, store)
+        self.assertNotIn(b, store)
+        self.assertIn(c, store)
+        self.assertEqual(8, store.size)
+
+    def test_pinned(self):
+        store = BlobStore(max_bytes=10)
+        a = store.put(b'a' * 4, pin=True)
+        b = store.put(b'b' * 4)
+        store.put(b'c' * 4)
+        self.assertIn(a, store)
+        self.assertNotIn(b, store)
+
+        store.unpin(a)
+        store.put(b'd' * 4)
+        self.assertNotIn(a, store)
+
+    def test_image_pins(self):
+        store = BlobStore(max_bytes=10)
+        image = Image(store=store)
+        image.data = b'a' * 4
+        first = image.key
+        for data in (b'b' * 4, b'c' * 4):
+            store.put(data)
+        self.assertEqual(b'a' * 4, image.data)
+
+        image.data = b'e' * 4
+        store.put(b'f' * 4)
+        self.assertNotIn(first, store)
+        key = image.key
+        del image
+        gc.collect()
+        store.put(b'g' * 4)
+        store.put(b'h' * 4)
+        self.assertNotIn(key, store)
+
+    def test_image(self):
+        image = Image()
+        image.data = b'\x89PNG'
+        self.assertEqual(f'/_blob/{image.key}', image.attributes['src'])
+        self.assertEqual(b'\x89PNG', image.data)
+        self.assertEqual({'src': image.attributes['src']}, image.outbox[-1]['attr'])
+
+
+class TestBlobHandler(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return MainApp.make_tornado_app()
+
+    def test_get(self):
+        key = default_store.put(b'\x89PNG data', 'image/png')
+        response = self.fetch(f'/_blob/{key}')
+        self.assertEqual(200, response.code)
+        self.assertEqual(b'\x89PNG data', response.body)
+        self.assertEqual('image/png', response.headers['Content-Type'])
+        self.assertIn('immutable', response.headers['Cache-Control'])
+
+        response = self.fetch(f'/_blob/{key}', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(304, response.code)
+
+    def test_missing(self):
+        self.assertEqual(404, self.fetch('/_blob/0123abcd').code)
+
+
+if __name__ == '__main__':
+    unittest.main()
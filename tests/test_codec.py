@@ -0,0 +1,86 @@
+import math
+import unittest
+from jibe import NotifyList2
+from jibe.widget import LoudDict
+from jibe.codec import codecs, get_codec, JSONCodec
+
+
+class TestCodec(unittest.TestCase):
+
+    def available(self):
+        for cls in codecs.values():
+            try:
+                yield cls()
+            except ImportError:
+                pass
+
+    def test_roundtrip(self):
+        message = {
+            'event': 'properties',
+            'properties': LoudDict(value='x', options=NotifyList2([1, 2.5, None])),
+            'path': ('a', 'b')
+        }
+        for codec in self.available():
+            self.assertEqual(
+                {'event': 'properties',
+                 'properties': {'value': 'x', 'options': [1, 2.5, None]},
+                 'path': ['a', 'b']},
+                codec.loads(codec.dumps(message)),
+                codec.name
+            )
+
+    def test_numpy(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest('NumPy is not installed.')
+
+        message = {'value': np.int64(3), 'flag': np.bool_(True),
+                   'array': np.arange(3, dtype=np.float32)}
+        for codec in self.available():
+            self.assertEqual(
+                {'value': 3, 'flag': True, 'array': [0.0, 1.0, 2.0]},
+                codec.loads(codec.dumps(message)),
+                codec.name
+            )
+
+    def test_same_output(self):
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        message = {'nan': float('nan'), 'inf': [float('-inf'), 1.5], 1: 'one', None: 2}
+        expected = {'nan': None, 'inf': [None, 1.5], '1': 'one', 'null': 2}
+        if np is not None:
+            message.update(scalar=np.int64(3), missing=np.float64('nan'),
+                           flag=np.bool_(False), array=np.array([np.nan, 2.]))
+            expected.update(scalar=3, missing=None, flag=False, array=[None, 2.])
+
+        encoded = set()
+        for codec in self.available():
+            if codec.binary:
+                continue
+            with self.subTest(codec=codec.name):
+                data = codec.dumps(message)
+                self.assertEqual(expected, codec.loads(data))
+                encoded.add(data.encode() if isinstance(data, str) else data)
+        self.assertEqual(1, len(encoded))
+
+    def test_msgpack_native(self):
+        try:
+            codec = get_codec('msgpack')
+        except ImportError:
+            self.skipTest('msgpack is not installed.')
+
+        decoded = codec.loads(codec.dumps({'nan': float('nan'), 1: 'one'}))
+        self.assertTrue(math.isnan(decoded['nan']))
+        self.assertEqual('one', decoded[1])
+
+    def test_get_codec(self):
+        self.assertIsInstance(get_codec('json'), JSONCodec)
+        self.assertIsNotNone(get_codec())
+
+
+if __name__ == '__main__':
+    unittest.main()
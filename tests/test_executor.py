@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import math
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from tornado.testing import AsyncTestCase, gen_test
+from jibe import MainApp, Label, Button, event_handler, run_in_executor
+from jibe.executor import configure, pools
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.frames = []
+        self.threads = set()
+
+    def write_message(self, message, binary=False):
+        self.threads.add(threading.get_ident())
+        self.frames.append(message)
+
+
+workers = []
+"""Threads in which Counter.on_compute ran."""
+
+
+class Counter(Label):
+
+    def __init__(self):
+        super().__init__('0')
+        self.running = 0
+        self.most = 0
+        self._lock = threading.Lock()
+
+    def work(self, n):
+        with self._lock:
+            self.running += 1
+            self.most = max(self.most, self.running)
+        time.sleep(0.02)
+        with self._lock:
+            self.running -= 1
+        return n
+
+    @event_handler('compute')
+    @run_in_executor()
+    def on_compute(self, msg):
+        workers.append(threading.get_ident())
+        return {'value': str(sum(range(msg['n'])))}
+
+
+class Factorial(Label):
+
+    @event_handler('compute')
+    @run_in_executor(pool='process')
+    def on_compute(self, msg):
+        return {'value': f"{math.factorial(msg['n'])} {os.getpid()} {self}"}
+
+
+class TestExecutor(AsyncTestCase):
+
+    def make_app(self):
+        app = MainApp(FakeConnection())
+        app.counter = Counter()
+        app.children = [app.counter]
+        app.on_message({'id': app.identifier, 'event': 'started'})
+        app.counter.on_message({'id': app.counter.identifier, 'event': 'started'})
+        return app
+
+    @gen_test
+    async def test_limit_per_app(self):
+        app = self.make_app()
+        app.max_offloaded = 2
+        counter = app.counter
+        results = await asyncio.gather(*[counter.offload(counter.work, i) for i in range(6)])
+        self.assertEqual(list(range(6)), results)
+        self.assertEqual(2, counter.most)
+
+    @gen_test
+    async def test_handler_in_thread(self):
+        app = self.make_app()
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        result = await app.counter.on_compute({'n': 10})
+        self.assertEqual({'value': '45'}, result)
+        self.assertNotEqual(threading.get_ident(), workers[-1])
+        self.assertEqual('45', app.counter.value)
+        await asyncio.sleep(0)
+
+        message = json.loads(app.connection.frames[-1])
+        self.assertEqual({'value': '45'}, message['properties'])
+        self.assertEqual({threading.get_ident()}, app.connection.threads)
+
+    @gen_test
+    async def test_process_pool(self):
+        with ProcessPoolExecutor(1) as pool:
+            self.assertEqual(3628800, await Button().offload(math.factorial, 10, pool=pool))
+
+    @gen_test
+    async def test_handler_in_process(self):
+        with ProcessPoolExecutor(1) as pool:
+            configure('process', pool)
+            try:
+                widget = Factorial()
+                await widget.on_compute({'n': 10})
+            finally:
+                pools.pop('process')
+        value, pid, owner = widget.value.split()
+        self.assertEqual('3628800', value)
+        self.assertNotEqual(str(os.getpid()), pid)
+        self.assertEqual('None', owner)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from tornado.testing import AsyncTestCase, gen_test
+from jibe import MainApp, Figure
+
+try:
+    import matplotlib
+except ImportError:
+    matplotlib = None
+
+
+release = threading.Event()
+calls = []
+
+
+def slow_renderer(draw, figsize, dpi, fmt, args, kwargs):
+    calls.append(args)
+    release.wait(5)
+    return repr(args).encode()
+
+
+class SlowFigure(Figure):
+    renderer = staticmethod(slow_renderer)
+
+
+class TestFigure(AsyncTestCase):
+
+    def setUp(self):
+        super().setUp()
+        calls.clear()
+        release.clear()
+
+    async def wait_idle(self, figure):
+        for _ in range(500):
+            if not figure.rendering:
+                return
+            await asyncio.sleep(0.01)
+        self.fail('Render did not finish.')
+
+    @gen_test
+    async def test_frame_dropping(self):
+        figure = SlowFigure(None, 0, executor=ThreadPoolExecutor(1), transport='frame')
+        for i in range(1, 6):
+            figure.update(i)
+        self.assertTrue(figure.rendering)  # The loop is free meanwhile.
+
+        release.set()
+        await self.wait_idle(figure)
+        await asyncio.sleep(0.01)
+        await self.wait_idle(figure)
+
+        self.assertEqual([(0,), (5,)], calls)
+        self.assertEqual(4, figure.dropped)
+        self.assertEqual(b'(5,)', figure.data)
+
+    @gen_test
+    async def test_update_from_thread(self):
+        app = MainApp(None)
+        figure = SlowFigure(None, 0, executor=ThreadPoolExecutor(1), transport='frame')
+        app.children = [figure]
+        release.set()
+        await self.wait_idle(figure)
+
+        thread = threading.Thread(target=figure.update, args=(1,))
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+        await self.wait_idle(figure)
+        self.assertEqual([(0,), (1,)], calls)
+        self.assertEqual(b'(1,)', figure.data)
+
+    @gen_test
+    async def test_matplotlib(self):
+        if matplotlib is None:
+            self.skipTest('Matplotlib is not installed.')
+
+        def draw(fig, slope):
+            fig.add_subplot().plot([0, 1], [0, slope])
+
+        figure = Figure(draw, 1, figsize=(2, 1), dpi=50)
+        await self.wait_idle(figure)
+        self.assertTrue(figure.data.startswith(b'\x89PNG'))
+        self.assertEqual('100', figure.attributes['width'])
+
+
+if __name__ == '__main__':
+    unittest.main()
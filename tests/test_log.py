@@ -0,0 +1,38 @@
+import logging
+import unittest
+from jibe import log, MainApp
+
+
+class Unformattable(dict):
+    """A message that fails if anybody tries to format it."""
+
+    def __repr__(self):
+        raise AssertionError('Message body was formatted.')
+
+    __str__ = __repr__
+
+
+class TestLog(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        log.logger.setLevel(logging.NOTSET)
+        log.log_bodies = True
+
+    def test_hierarchy(self):
+        self.assertEqual('jibe.widget', log.get_logger('jibe.widget').name)
+        self.assertEqual('jibe.custom', log.get_logger('custom').name)
+        self.assertIs(log.logger, log.get_logger('jibe.widget').parent)
+
+    def test_production_never_formats_bodies(self):
+        handler = logging.NullHandler()
+        log.configure('production', handler=handler)
+        log.logger.setLevel(logging.DEBUG)  # Even if DEBUG is enabled.
+        try:
+            app = MainApp(None)
+            app.on_message(Unformattable(id=app.identifier, event='children'))
+        finally:
+            log.logger.removeHandler(handler)
+
+
+if __name__ == '__main__':
+    unittest.main()
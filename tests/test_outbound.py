@@ -0,0 +1,360 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+from tornado.testing import AsyncTestCase, gen_test
+from jibe import MainApp, Label, ProgressBar, Image, HBox
+from jibe.app import BLOB_FRAME
+from jibe import widget
+
+
+class FakeConnection:
+    """
+    Stands in for the WebSocketHandler. Keeps the frames written to it.
+    """
+
+    def __init__(self):
+        self.frames = []
+
+    def write_message(self, message, binary=False):
+        self.frames.append(message)
+
+
+class SlowConnection(FakeConnection):
+    """
+    A connection whose frames are sent out when release() is called.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.futures = []
+        self.closed = False
+
+    def write_message(self, message, binary=False):
+        super().write_message(message, binary)
+        future = asyncio.get_event_loop().create_future()
+        self.futures.append(future)
+        return future
+
+    def release(self):
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.set_result(None)
+
+    def close(self):
+        self.closed = True
+
+
+def make_app(n=3, connection=None):
+    """
+    An app with n labels, all ready in the browser.
+    """
+    app = MainApp(connection or FakeConnection())
+    app.labels = [Label(str(i)) for i in range(n)]
+    app.children = app.labels
+    app.on_message({'id': app.identifier, 'event': 'started'})
+    for label in app.labels:
+        label.on_message({'id': label.identifier, 'event': 'started'})
+    return app
+
+
+class TestOutbound(AsyncTestCase):
+
+    @gen_test
+    async def test_one_frame_per_tick(self):
+        app = make_app()
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        for i, label in enumerate(app.labels):
+            label.value = f'new {i}'
+
+        self.assertEqual([], app.connection.frames)
+        await asyncio.sleep(0)
+        self.assertEqual(1, len(app.connection.frames))
+
+        frame = json.loads(app.connection.frames[0])
+        self.assertEqual(3, len(frame['batch']))
+        self.assertEqual({'value': 'new 2'}, frame['batch'][2]['properties'])
+
+    @gen_test
+    async def test_single_message_not_wrapped(self):
+        app = make_app()
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        app.labels[0].value = 'alone'
+        await asyncio.sleep(0)
+
+        frame = json.loads(app.connection.frames[0])
+        self.assertEqual('properties', frame['event'])
+
+    @gen_test
+    async def test_last_write_wins(self):
+        app = make_app()
+        progress = ProgressBar()
+        app.children.append(progress)
+        progress.on_message({'id': progress.identifier, 'event': 'started'})
+        progress.inner.on_message({'id': progress.inner.identifier, 'event': 'started'})
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        for _ in range(50):
+            progress.value += 1
+        app.labels[0].css({'color': 'red'})
+        app.labels[0].css({'color': 'blue', 'margin': '0px'})
+
+        await asyncio.sleep(0)
+        messages = json.loads(app.connection.frames[0])['batch']
+        self.assertEqual(3, len(messages))
+
+        props, inner_css, label_css = messages
+        self.assertEqual({'value': 50}, props['properties'])
+        self.assertEqual('50%', inner_css['css']['max-width'])
+        self.assertEqual({'color': 'blue', 'margin': '0px'}, label_css['css'])
+
+    @gen_test
+    async def test_caller_dict_untouched(self):
+        app = make_app()
+        await asyncio.sleep(0)
+
+        style = {'color': 'red'}
+        app.labels[0].css(style)
+        app.labels[0].css({'margin': '0px'})
+        self.assertEqual({'color': 'red'}, style)
+
+    @gen_test
+    async def test_types_sent_once(self):
+        app = MainApp(FakeConnection())
+        app.children = [Label('a'), Label('b')]
+        app.on_message({'id': app.identifier, 'event': 'started'})
+        await asyncio.sleep(0)
+
+        types, children = json.loads(app.connection.frames[0])['batch']
+        self.assertEqual('types', types['event'])
+        self.assertEqual(1, len(types['types']))
+        type_id = children['children'][0]['type']
+        self.assertEqual('<p>{{ value }}</p>', types['types'][type_id]['template'])
+        self.assertNotIn('template', children['children'][0])
+
+        app.children.append(Label('c'))
+        await asyncio.sleep(0)
+        message = json.loads(app.connection.frames[1])
+        self.assertEqual('append', message['event'])
+        self.assertEqual(type_id, message['child']['type'])
+
+    @gen_test
+    async def test_types_evicted(self):
+        app = make_app(0)
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        with mock.patch('jibe.widget.max_widget_types', 2):
+            labels = []
+            for i in range(4):
+                label = Label(str(i))
+                label.template_txt = f'<p>{i} {{{{ value }}}}</p>'
+                labels.append(label)
+            app.children = labels
+            self.assertLessEqual(len(widget.widget_types), 2)
+        await asyncio.sleep(0)
+
+        types, children = json.loads(app.connection.frames[0])['batch']
+        self.assertEqual([f'<p>{i} {{{{ value }}}}</p>' for i in range(4)],
+                         [types['types'][c['type']]['template'] for c in children['children']])
+
+    @gen_test
+    async def test_remove_drops_pending(self):
+        app = make_app()
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        label = app.labels[0]
+        label.value = 'never sent'
+        app.children.remove(label)
+        await asyncio.sleep(0)
+
+        message = json.loads(app.connection.frames[0])
+        self.assertEqual({'event': 'remove', 'id': app.identifier,
+                          'childid': label.identifier}, message)
+
+    @gen_test
+    async def test_children_ops(self):
+        app = make_app(4)
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        a, b, c, d = app.labels
+        e = Label('e')
+        app.children = [b, c, a, e]
+        await asyncio.sleep(0)
+
+        message = json.loads(app.connection.frames[0])
+        self.assertEqual('children_ops', message['event'])
+        remove, insert, move = message['ops']
+        self.assertEqual({'op': 'remove', 'childid': d.identifier}, remove)
+        self.assertEqual(('insert', None, e.identifier),
+                         (insert['op'], insert['before'], insert['child']['id']))
+        self.assertEqual({'op': 'move', 'childid': a.identifier,
+                          'before': e.identifier}, move)
+
+        app.children = [b, c, a, e]
+        await asyncio.sleep(0)
+        self.assertEqual(1, len(app.connection.frames))
+
+    @gen_test
+    async def test_children_replaced(self):
+        app = make_app(2)
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        app.children = [Label('new')]
+        await asyncio.sleep(0)
+        self.assertEqual('children', json.loads(app.connection.frames[0])['event'])
+
+    @gen_test
+    async def test_blob_frames(self):
+        app = make_app(1)
+        image = Image(transport='frame')
+        app.children.append(image)
+        image.on_message({'id': image.identifier, 'event': 'started'})
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        image.data = b'first'
+        image.data = b'\x89PNG last'
+        app.labels[0].value = 'text'
+        await asyncio.sleep(0)
+
+        message, frame = app.connection.frames
+        self.assertEqual('properties', json.loads(message)['event'])
+        ident, mime = image.identifier.encode(), b'image/png'
+        self.assertEqual(bytes([BLOB_FRAME, len(ident)]) + ident + bytes([len(mime)]) + mime +
+                         b'\x89PNG last', frame)
+
+
+    @gen_test
+    async def test_blob_resent_after_move(self):
+        app = make_app(0)
+        first, second = HBox(), HBox()
+        image = Image(transport='frame')
+        first.children.append(image)
+        app.children = [first, second]
+        for widget in (first, second, image):
+            widget.on_message({'id': widget.identifier, 'event': 'started'})
+        image.data = b'\x89PNG'
+        await asyncio.sleep(0)
+        app.connection.frames = []
+
+        first.children.remove(image)
+        second.children.append(image)
+        image.on_message({'id': image.identifier, 'event': 'started'})
+        await asyncio.sleep(0)
+        self.assertTrue(app.connection.frames[-1].endswith(b'\x89PNG'))
+
+
+class TestBackpressure(AsyncTestCase):
+
+    @staticmethod
+    async def make_slow_app(n=3, **settings):
+        app = make_app(n, SlowConnection())
+        for name, value in settings.items():
+            setattr(app, name, value)
+        await asyncio.sleep(0)
+        app.connection.release()
+        await asyncio.sleep(0)
+        app.connection.frames = []
+        return app
+
+    @gen_test
+    async def test_congested(self):
+        app = await self.make_slow_app(max_in_flight_bytes=1)
+        label = app.labels[0]
+        label.value = 'a'
+        await asyncio.sleep(0)
+        self.assertEqual(1, len(app.connection.frames))
+
+        for i in range(10):
+            label.value = str(i)
+            await asyncio.sleep(0)
+        self.assertEqual(1, len(app.connection.frames))
+        self.assertEqual(1, app.queue_depth)
+
+        app.connection.release()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(2, len(app.connection.frames))
+        self.assertEqual({'value': '9'}, json.loads(app.connection.frames[1])['properties'])
+        self.assertEqual(len(app.connection.frames[1]), app.in_flight_bytes)
+
+    @gen_test
+    async def test_merge(self):
+        app = await self.make_slow_app(max_pending=2)
+        for i in range(5):
+            for label in app.labels:
+                label.message({'event': 'ping', 'n': i})
+        self.assertEqual(3, app.queue_depth)
+        await asyncio.sleep(0)
+        batch = json.loads(app.connection.frames[0])['batch']
+        self.assertEqual([4, 4, 4], [message['n'] for message in batch])
+
+    @gen_test
+    async def test_merge_once(self):
+        app = await self.make_slow_app(n=1, max_pending=2)
+        for i in range(3):
+            app.labels[0].message({'event': 'ping', 'n': i})
+        with mock.patch.object(app, '_merge_pending', wraps=app._merge_pending) as merge:
+            for i in range(5):
+                app.children.append(Label(str(i)))
+            self.assertEqual(0, merge.call_count)
+        self.assertEqual(6, app.queue_depth)
+
+    @gen_test
+    async def test_drop_oldest(self):
+        app = await self.make_slow_app(n=1, max_pending=3, overflow_policy='drop-oldest')
+        label = app.labels[0]
+        app.children.append(Label('new'))
+        for i in range(5):
+            label.message({'event': 'ping', 'n': i})
+        self.assertEqual(3, app.queue_depth)
+        self.assertEqual(3, app.queue_stats['dropped'])
+        events = [(m['event'], m.get('n')) for m in app.pending.values()]
+        self.assertEqual([('append', None), ('ping', 3), ('ping', 4)], events)
+
+    @gen_test
+    async def test_disconnect(self):
+        app = await self.make_slow_app(n=1, max_pending=2, overflow_policy='disconnect')
+        for i in range(3):
+            app.labels[0].message({'event': 'ping', 'n': i})
+        self.assertTrue(app.connection.closed)
+        self.assertEqual(0, app.queue_depth)
+
+    @gen_test
+    async def test_block(self):
+        app = await self.make_slow_app(n=1, max_pending=2, overflow_policy='block')
+        label = app.labels[0]
+        waits = [label.message({'event': 'ping', 'n': i}) for i in range(4)]
+        self.assertEqual([None, None], waits[:2])
+        self.assertEqual(4, app.queue_depth)
+        self.assertFalse(waits[2].done())
+
+        await waits[3]
+        self.assertEqual(0, app.queue_depth)
+        self.assertTrue(waits[2].done())
+        self.assertEqual(4, len(json.loads(app.connection.frames[0])['batch']))
+
+    @gen_test
+    async def test_drain(self):
+        app = await self.make_slow_app(n=1, max_in_flight_bytes=1)
+        app.labels[0].value = 'x'
+        await asyncio.sleep(0)
+        drain = asyncio.ensure_future(app.drain())
+        await asyncio.sleep(0)
+        self.assertFalse(drain.done())
+
+        app.connection.release()
+        await drain
+        self.assertEqual(0, app.in_flight_bytes)
+
+if __name__ == '__main__':
+    unittest.main()
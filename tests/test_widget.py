@@ -0,0 +1,274 @@
+import unittest
+from jibe import MainApp, Widget, Button, Label, VBox, HBox, VirtualList, DataTable, event_handler
+from jibe.widget import IdentifierAllocator, diff_children, np
+
+
+class TestEventHandlers(unittest.TestCase):
+
+    def test_inherited(self):
+        button = Button()
+        self.assertEqual({'children', 'started', 'click'},
+                         set(button.local_event_handlers))
+        self.assertEqual(button.on_click, button.local_event_handlers['click'])
+        self.assertEqual([], button.subscribers['click'])
+
+    def test_table_built_once(self):
+        class Custom(Widget):
+            @event_handler('ping')
+            def on_ping(self, msg):
+                pass
+
+        self.assertIn('_event_handlers', Custom.__dict__)
+        a, b = Custom(), Custom()
+        self.assertIs(a.local_event_handlers['ping'].__func__,
+                      b.local_event_handlers['ping'].__func__)
+        self.assertIsNot(a.subscribers['ping'], b.subscribers['ping'])
+
+    def test_override_without_decorator(self):
+        class Quiet(Button):
+            def on_click(self, msg):
+                pass
+
+        self.assertNotIn('click', Quiet().local_event_handlers)
+
+    def test_duplicate_handler(self):
+        with self.assertRaises(TypeError):
+            class Twice(Button):
+                @event_handler('click')
+                def on_other_click(self, msg):
+                    pass
+
+
+class TestIdentifiers(unittest.TestCase):
+
+    def test_base36(self):
+        allocator = IdentifierAllocator()
+        ids = [allocator() for _ in range(37)]
+        self.assertEqual(['w1', 'w2'], ids[:2])
+        self.assertEqual(['wz', 'w10', 'w11'], ids[34:37])
+
+    def test_active_allocator(self):
+        outer, inner = IdentifierAllocator('a'), IdentifierAllocator('b')
+        with outer.activate():
+            self.assertEqual('a1', Label().identifier)
+            with inner.activate():
+                self.assertEqual('b1', Label().identifier)
+            self.assertEqual('a2', Label().identifier)
+        self.assertTrue(Label().identifier.startswith('g'))
+
+    def test_explicit(self):
+        with IdentifierAllocator().activate():
+            self.assertEqual('topwidget', Widget(identifier='topwidget').identifier)
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_bottom_up(self):
+        labels = [Label(str(i)) for i in range(4)]
+        tree = VBox([HBox(labels[:2]), HBox(labels[2:])])
+        self.assertIsNone(labels[0].app)
+
+        app = MainApp(None)
+        app.children = [tree]
+        self.assertIs(app, labels[3].app)
+        self.assertIs(labels[3], app.descendent_index[labels[3].identifier])
+        self.assertEqual(7, len(app.descendent_index))
+        self.assertFalse(hasattr(tree, 'descendent_index'))
+
+    def test_top_down(self):
+        app = MainApp(None)
+        box = HBox()
+        app.children = [box]
+        label = Label()
+        box.children.append(label)
+        self.assertIs(app, label.app)
+        self.assertIn(label.identifier, app.descendent_index)
+
+    def test_remove(self):
+        app = MainApp(None)
+        label = Label()
+        box = HBox([label])
+        app.children = [box]
+        box.browser_side_ready = label.browser_side_ready = True
+
+        box.children.remove(box.children[0])
+        self.assertIsNone(label.parent)
+        self.assertIsNone(label.app)
+        self.assertFalse(label.browser_side_ready)
+        self.assertNotIn(label.identifier, app.descendent_index)
+        self.assertIn(box.identifier, app.descendent_index)
+
+    def test_message_for_removed(self):
+        app = MainApp(None)
+        label = Label()
+        app.children = [label]
+        app.children.remove(label)
+        app.on_message({'id': label.identifier, 'event': 'started'})
+        self.assertFalse(label.browser_side_ready)
+
+    def test_replace_children(self):
+        app = MainApp(None)
+        kept, dropped = Label(), HBox([Label()])
+        app.children = [kept, dropped]
+        app.children = [kept]
+        self.assertIs(app, kept.app)
+        self.assertIsNone(dropped.app)
+        self.assertIsNone(dropped.children[0].app)
+        self.assertEqual(1, len(app.descendent_index))
+
+    def test_move(self):
+        app = MainApp(None)
+        label = Label()
+        first, second = HBox([label]), HBox()
+        app.children = [first, second]
+        second.children.append(label)
+        first.children.remove(label)
+        self.assertIs(second, label.parent)
+        self.assertIs(app, label.app)
+        self.assertIn(label.identifier, app.descendent_index)
+
+
+class TestDiffChildren(unittest.TestCase):
+
+    @staticmethod
+    def apply(old, ops):
+        result = list(old)
+        for op in ops:
+            if op[0] != 'insert':
+                result.remove(op[1])
+            if op[0] != 'remove':
+                result.insert(len(result) if op[2] is None else result.index(op[2]), op[1])
+        return result
+
+    def test_minimal_moves(self):
+        a, b, c, d = old = [Label() for _ in range(4)]
+        ops = diff_children(old, [d, a, b, c])
+        self.assertEqual([('move', d, a)], ops)
+
+    def test_apply(self):
+        pool = [Label() for _ in range(6)]
+        cases = [([], pool), (pool, []), (pool, pool[::-1]),
+                 (pool[:4], pool[2:]), (pool[::2], pool[1::2] + pool[:1])]
+        for old, new in cases:
+            self.assertEqual(new, self.apply(old, diff_children(old, new)))
+
+
+class TestVirtualList(unittest.TestCase):
+
+    def setUp(self):
+        self.created = 0
+
+    def factory(self, item):
+        self.created += 1
+        return Label(item)
+
+    @staticmethod
+    def update(row, item):
+        row.value = item
+
+    def values(self, vlist):
+        return sorted((int(row.style['top'][:-2]), row.value) for row in vlist.children)
+
+    def test_window(self):
+        source = [str(i) for i in range(100000)]
+        vlist = VirtualList(source, self.factory, row_height=20, height=100, overscan=2)
+        self.assertEqual(7, len(vlist.children))
+        self.assertEqual(2000000, vlist.scrollHeight)
+
+        vlist.on_message({'id': vlist.identifier, 'event': 'viewport',
+                          'first': 1000, 'last': 1005})
+        self.assertEqual(9, len(vlist.children))
+        self.assertEqual((998 * 20, '998'), self.values(vlist)[0])
+        self.assertEqual((1006 * 20, '1006'), self.values(vlist)[-1])
+
+    def test_recycle(self):
+        source = [str(i) for i in range(1000)]
+        vlist = VirtualList(source, self.factory, self.update,
+                            row_height=20, height=100, overscan=2)
+        vlist.show(10, 15)
+        self.assertEqual(9, self.created)
+        rows = set(map(id, vlist.children))
+
+        vlist.show(500, 505)
+        self.assertEqual(rows, set(map(id, vlist.children)))
+        self.assertEqual([str(i) for i in range(498, 507)], [v for _, v in self.values(vlist)])
+        self.assertEqual(9, self.created)
+
+    def test_refresh(self):
+        source = [str(i) for i in range(10)]
+        vlist = VirtualList(source, self.factory, self.update,
+                            row_height=20, height=100, overscan=2)
+        del source[3:]
+        vlist.refresh()
+        self.assertEqual(60, vlist.scrollHeight)
+        self.assertEqual(['0', '1', '2'], [v for _, v in self.values(vlist)])
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed.')
+class TestDataTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = DataTable({
+            'n': np.arange(10),
+            'name': [f'Item {i}' for i in range(10)],
+            'x': np.array([5., 3., 8., 1., 9., 2., 7., 4., 6., 0.])
+        }, page_size=4)
+
+    def last_page(self):
+        return self.table.outbox[-1]['page']
+
+    def test_pages(self):
+        page = self.last_page()
+        self.assertEqual((0, 3, 10), (page['number'], page['pages'], page['rows']))
+        self.assertEqual([0, 1, 2, 3], page['columns']['n'])
+
+        self.table.on_message({'id': self.table.identifier, 'event': 'goto', 'page': 7})
+        self.assertEqual([8, 9], self.last_page()['columns']['n'])
+
+    def test_sort_and_filter(self):
+        self.table.on_message({'id': self.table.identifier, 'event': 'sort', 'column': 'x'})
+        self.assertEqual([9, 3, 5, 1], self.last_page()['columns']['n'])
+        self.table.on_message({'id': self.table.identifier, 'event': 'sort', 'column': 'x'})
+        self.assertEqual(['x', False], self.last_page()['sort'])
+        self.assertEqual([9., 8., 7., 6.], self.last_page()['columns']['x'])
+
+        self.table.filter('x', '>= 4')
+        self.assertEqual([4, 2, 6, 8], self.last_page()['columns']['n'])
+        self.table.filter('name', 'ITEM 1')
+        self.assertEqual([], self.last_page()['columns']['n'])
+        self.table.filter('x', None)
+        self.assertEqual([1], self.last_page()['columns']['n'])
+
+    def test_bool_filter(self):
+        self.table.set_data({'n': np.arange(4), 'done': np.array([True, False, False, True])})
+        self.table.filter('done', 'False')
+        self.assertEqual([1, 2], self.last_page()['columns']['n'])
+        self.table.filter('done', '= 1')
+        self.assertEqual([0, 3], self.last_page()['columns']['n'])
+        self.table.filter('done', 'maybe')
+        self.assertEqual([0, 1, 2, 3], self.last_page()['columns']['n'])
+
+    def test_out_of_range_filter(self):
+        self.table.set_data({'n': np.arange(3, dtype=np.uint8)})
+        for text in ('-1', '300', '99999999999999999999'):
+            self.table.filter('n', text)
+            self.assertEqual([0, 1, 2], self.last_page()['columns']['n'])
+        self.table.sort('n')
+        self.assertEqual([0, 1, 2], self.last_page()['columns']['n'])
+
+    def test_sort_mixed_objects(self):
+        self.table.set_data({'x': np.array([1, 'a', None], dtype=object)})
+        self.table.on_message({'id': self.table.identifier, 'event': 'sort', 'column': 'x'})
+        self.assertEqual([1, None, 'a'], self.last_page()['columns']['x'])
+
+    def test_missing_values(self):
+        self.table.set_data({'x': np.array([1.5, np.nan])})
+        self.assertEqual([1.5, None], self.last_page()['columns']['x'])
+
+    def test_lengths(self):
+        with self.assertRaises(ValueError):
+            self.table.set_data({'a': [1, 2], 'b': [1]})
+
+
+if __name__ == '__main__':
+    unittest.main()
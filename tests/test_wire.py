@@ -0,0 +1,108 @@
+import unittest
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.websocket import websocket_connect
+from jibe import MainApp, Label
+from jibe.codec import msgpack, MessagePackCodec, JSONCodec
+
+
+def unbatch(message):
+    return message['batch'] if 'batch' in message else [message]
+
+
+class WireApp(MainApp):
+
+    codec = JSONCodec()
+    binary_codec = MessagePackCodec() if msgpack is not None else None
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.children = [Label('hello')]
+
+
+class TestWire(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return WireApp.make_tornado_app()
+
+    async def connect(self, subprotocols):
+        url = f'ws://127.0.0.1:{self.get_http_port()}/websocket'
+        return await websocket_connect(url, subprotocols=subprotocols)
+
+    @gen_test
+    async def test_json(self):
+        ws = await self.connect(['jibe.json'])
+        self.assertEqual('jibe.json', ws.selected_subprotocol)
+
+        ws.write_message(WireApp.codec.dumps({'id': 'topwidget', 'event': 'started'}))
+        types, message = unbatch(WireApp.codec.loads(await ws.read_message()))
+        self.assertEqual('types', types['event'])
+        self.assertEqual('children', message['event'])
+        self.assertEqual('hello', message['children'][0]['properties']['value'])
+        self.assertIn(message['children'][0]['type'], types['types'])
+        ws.close()
+
+    @gen_test
+    async def test_msgpack(self):
+        if msgpack is None:
+            self.skipTest('msgpack is not installed.')
+
+        ws = await self.connect(['jibe.msgpack', 'jibe.json'])
+        self.assertEqual('jibe.msgpack', ws.selected_subprotocol)
+
+        codec = WireApp.binary_codec
+        ws.write_message(codec.dumps({'id': 'topwidget', 'event': 'started'}), binary=True)
+        data = await ws.read_message()
+        self.assertIsInstance(data, bytes)
+        types, message = unbatch(codec.loads(data))
+        self.assertEqual('children', message['event'])
+        ws.close()
+
+    @gen_test
+    async def test_no_subprotocol(self):
+        ws = await self.connect(None)
+        self.assertIsNone(ws.selected_subprotocol)
+        ws.close()
+
+
+class CompressedApp(MainApp):
+
+    websocket_compression = {'compression_level': 9, 'min_size': 200}
+    instances = []
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.label = Label('x' * 2000)
+        self.children = [self.label]
+        self.instances.append(self)
+
+
+class TestCompression(AsyncHTTPTestCase):
+
+    def get_app(self):
+        return CompressedApp.make_tornado_app()
+
+    @gen_test
+    async def test_compression(self):
+        url = f'ws://127.0.0.1:{self.get_http_port()}/websocket'
+        ws = await websocket_connect(url, compression_options={})
+
+        ws.write_message(JSONCodec().dumps({'id': 'topwidget', 'event': 'started'}))
+        types, message = unbatch(JSONCodec().loads(await ws.read_message()))
+        self.assertEqual('x' * 2000, message['children'][0]['properties']['value'])
+
+        handler = CompressedApp.instances[-1].connection
+        self.assertEqual(1, handler.compression_stats['compressed_messages'])
+        self.assertGreater(handler.bytes_saved, 1000)
+
+        # Below min_size.
+        app = CompressedApp.instances[-1]
+        app.label.on_message({'id': app.label.identifier, 'event': 'started'})
+        app.label.value = 'short'
+        message = JSONCodec().loads(await ws.read_message())
+        self.assertEqual({'value': 'short'}, message['properties'])
+        self.assertEqual(1, handler.compression_stats['skipped_messages'])
+        ws.close()
+
+
+if __name__ == '__main__':
+    unittest.main()